@@ -10,21 +10,39 @@ import io
 import csv
 import json
 import logging
+import math
+import signal
 import traceback
 import smtplib
 import atexit
+import base64
 import socket
 import ipaddress
+import hashlib
+import heapq
+import string
+import threading
+import zlib
+import multiprocessing
 from email.mime.text import MIMEText
-from collections import Counter
-from urllib.parse import urlparse
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from operator import itemgetter
+from urllib.parse import urljoin, urlsplit
 from typing import Any, Optional, Union, cast
 
 from flask import (Flask, render_template, request, Response,
                    stream_with_context, jsonify, send_file)
+from flask.json.provider import DefaultJSONProvider
 from flask.typing import ResponseReturnValue
+from markupsafe import escape
+import requests
+from requests.adapters import HTTPAdapter
 from web_scraper import NewsAggregator
 from database import Database
+from utils.summarizer import extract_summary, load_extractor
 import nltk
 
 # Security extensions
@@ -47,6 +65,12 @@ try:
 except ImportError:
     _cors_available = False
 
+try:
+    import orjson
+    _orjson_available = True
+except ImportError:
+    _orjson_available = False
+
 # Attempt to import optional dependencies
 try:
     from nltk.sentiment.vader import SentimentIntensityAnalyzer
@@ -60,24 +84,91 @@ try:
 except ImportError:
     _scheduler_available = False
 
+try:
+    from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+    _sqlalchemy_jobstore_available = True
+except ImportError:
+    _sqlalchemy_jobstore_available = False
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory file locks
+    fcntl = None
+
 logger = logging.getLogger(__name__)
 
+# Marker written once all NLTK resources are present, so warm boots skip the lookup
+NLTK_READY_FLAG = os.path.expanduser(os.getenv('NLTK_READY_FLAG', '~/.cache/sniffer_nltk_ok'))
+
+
 # Ensure NLTK data is downloaded (lazy, non-blocking)
 def ensure_nltk_data():
     """Download NLTK data if missing. Called on first use, not at import."""
-    for resource in ['tokenizers/punkt', 'tokenizers/punkt_tab',
-                     'sentiment/vader_lexicon', 'corpora/stopwords']:
+    if os.getenv('NLTK_READY') or os.path.exists(NLTK_READY_FLAG):
+        return
+
+    all_present = True
+    # Only the corpora the app loads; VADER does its own tokenizing, so no punkt
+    for resource in ['sentiment/vader_lexicon', 'corpora/stopwords']:
         try:
             nltk.data.find(resource)
         except LookupError:
-            nltk.download(resource.split('/')[-1], quiet=True)
+            if not nltk.download(resource.split('/')[-1], quiet=True):
+                all_present = False
+
+    if all_present:
+        try:
+            os.makedirs(os.path.dirname(NLTK_READY_FLAG), exist_ok=True)
+            open(NLTK_READY_FLAG, 'w').close()
+        except OSError:
+            pass
 
 # Call once at startup (after imports, before routes)
 ensure_nltk_data()
 
+# VADER loads its lexicon from disk in the constructor, so build it once and reuse
+_SIA = None
+if _vader_available:
+    try:
+        _SIA = SentimentIntensityAnalyzer()
+    except LookupError:
+        logger.warning("VADER lexicon not available. Sentiment analysis disabled.")
+
 app = Flask(__name__)
 
 
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider that serializes with orjson instead of the stdlib encoder."""
+
+    # Match DefaultJSONProvider: sorted keys, and non-str keys (e.g. a NULL
+    # sentiment group) coerced to strings
+    options = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS if _orjson_available else 0
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        options = self.options
+        if kwargs.get('indent'):
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=options).decode()
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        """Builds jsonify() bodies straight from orjson bytes, skipping the str round-trip."""
+        obj = self._prepare_response_obj(args, kwargs)
+        options = self.options | orjson.OPT_APPEND_NEWLINE
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            options |= orjson.OPT_INDENT_2
+        return self._app.response_class(orjson.dumps(obj, default=self.default, option=options),
+                                        mimetype=self.mimetype)
+
+
+if _orjson_available:
+    app.json = ORJSONProvider(app)
+else:
+    logger.info("orjson not available. Using the default JSON provider.")
+
+
 @app.context_processor
 def inject_article_image_helpers():
     """Provide a reliable photo for articles whose feed has no thumbnail."""
@@ -191,10 +282,25 @@ def get_aggregator() -> NewsAggregator:
     from web_scraper import NewsAggregator
     return NewsAggregator()
 
+
+def publish_source_health(agg: NewsAggregator) -> None:
+    """Stores a finished scrape's source health in the DB.
+
+    Gunicorn runs several workers and only one of them scrapes, so the health
+    has to live somewhere they all read rather than in process memory.
+    """
+    db.save_source_health(agg.get_health())
+
+
+def get_source_health() -> list[dict]:
+    """Returns the last stored source health, or idle entries before the first scrape."""
+    return db.get_source_health() or get_aggregator().get_health()
+
 MAX_SCRAPE_PAGES = 5
 MAX_PAGE_NUMBER = 1000
 MAX_KEYWORD_LENGTH = 120
 MAX_SEARCH_QUERY_LENGTH = 100
+MAX_CURSOR_LENGTH = 200
 
 ALLOWED_SORT_OPTIONS = {'score', 'comments', 'newest'}
 ALLOWED_SOURCE_FILTERS = {'all', 'Hacker News', 'TechCrunch', 'Reddit', 'The Verge', 'Ars Technica'}
@@ -253,6 +359,33 @@ def normalize_source_filter(source: str) -> str:
     return value if value in ALLOWED_SOURCE_FILTERS else 'all'
 
 
+def encode_cursor(cursor: tuple) -> str:
+    """Packs a keyset cursor into an opaque URL-safe token."""
+    return base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+
+
+def _is_cursor_value(value: Any) -> bool:
+    """Cursor values must bind as SQL numbers: 64-bit ints or finite floats."""
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, int):
+        return -2**63 <= value < 2**63
+    return isinstance(value, float) and math.isfinite(value)
+
+
+def decode_cursor(token: str) -> Optional[tuple]:
+    """Unpacks a cursor token; returns None if it is malformed."""
+    if len(token) > MAX_CURSOR_LENGTH:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token.encode()))
+    except ValueError:  # covers bad base64, bad UTF-8 and bad JSON
+        return None
+    if not isinstance(values, list) or not all(_is_cursor_value(v) for v in values):
+        return None
+    return tuple(values)
+
+
 def parse_positive_int(value: Any) -> Optional[int]:
     try:
         parsed = int(value)
@@ -269,15 +402,27 @@ def get_json_payload() -> Optional[dict[str, Any]]:
     return None
 
 
-EMAIL_REGEX = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+# Same acceptance as ^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$, checked
+# linearly with character sets instead of a backtracking regex
+EMAIL_LOCAL_CHARS = frozenset(string.ascii_letters + string.digits + '._%+-')
+EMAIL_DOMAIN_CHARS = frozenset(string.ascii_letters + string.digits + '.-')
 
 
+@lru_cache(maxsize=4096)
 def is_valid_email(email: str) -> bool:
     if not email or len(email) > 254:
         return False
     if '\n' in email or '\r' in email:
         return False
-    return bool(EMAIL_REGEX.fullmatch(email))
+
+    local, at, domain = email.partition('@')
+    if not at or not local or not EMAIL_LOCAL_CHARS.issuperset(local):
+        return False
+
+    host, dot, tld = domain.rpartition('.')
+    if not dot or not host or not EMAIL_DOMAIN_CHARS.issuperset(host):
+        return False
+    return len(tld) >= 2 and tld.isascii() and tld.isalpha()
 
 
 BLOCKED_HOSTS = {'localhost', '127.0.0.1', '0.0.0.0', '169.254.169.254', '::1'}
@@ -315,19 +460,37 @@ def _resolves_to_disallowed_ip(hostname: str) -> bool:
     return False
 
 
-def is_safe_url(url: str) -> bool:
-    parsed = urlparse((url or '').strip())
-    if parsed.scheme not in ('http', 'https'):
-        return False
+@lru_cache(maxsize=1024)
+def _static_url_host(url: str) -> Optional[str]:
+    """Runs the DNS-independent URL checks; returns the normalized hostname or None."""
+    if not url[:8].lower().startswith(('http://', 'https://')):
+        return None
 
+    parsed = urlsplit(url)
     if not parsed.netloc or parsed.username or parsed.password:
-        return False
+        return None
 
     hostname = (parsed.hostname or '').strip().lower().rstrip('.')
     if not hostname:
-        return False
+        return None
 
     if hostname in BLOCKED_HOSTS or hostname.endswith('.localhost'):
+        return None
+
+    try:
+        port = parsed.port
+    except ValueError:
+        return None
+    if port and port not in (80, 443):
+        return None
+
+    return hostname
+
+
+def is_safe_url(url: str) -> bool:
+    # Only the static checks are cached: DNS answers can change between calls
+    hostname = _static_url_host((url or '').strip())
+    if hostname is None:
         return False
 
     try:
@@ -338,9 +501,6 @@ def is_safe_url(url: str) -> bool:
         if _resolves_to_disallowed_ip(hostname):
             return False
 
-    if parsed.port and parsed.port not in (80, 443):
-        return False
-
     return True
 
 
@@ -378,12 +538,33 @@ def normalize_category_filter(category: str) -> str:
     return CATEGORY_FILTER_LOOKUP.get(value, 'all')
 
 
+_CATEGORY_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Per category: single-word keywords as a frozenset for O(1) membership tests,
+# multi-word/hyphenated keywords as phrases that still need a substring check
+_CATEGORY_INDEX = {
+    category: (
+        frozenset(kw for kw in keywords if _CATEGORY_TOKEN_RE.fullmatch(kw)),
+        tuple(kw for kw in keywords if not _CATEGORY_TOKEN_RE.fullmatch(kw)),
+    )
+    for category, keywords in CATEGORY_KEYWORDS.items()
+}
+
+
+def _title_tokens(title_lower: str) -> set[str]:
+    """Tokenizes a lowercased title, adding the singular of simple plurals."""
+    tokens = set(_CATEGORY_TOKEN_RE.findall(title_lower))
+    tokens.update([t[:-1] for t in tokens if len(t) > 3 and t.endswith('s')])
+    return tokens
+
+
 def classify_article(title: str) -> str:
     """Classifies an article into a category based on keyword matching."""
     title_lower = title.lower()
+    tokens = _title_tokens(title_lower)
     scores = {}
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        score = sum(1 for kw in keywords if kw in title_lower)
+    for category, (single_words, phrases) in _CATEGORY_INDEX.items():
+        score = len(tokens & single_words) + sum(1 for p in phrases if p in title_lower)
         if score > 0:
             scores[category] = score
 
@@ -408,14 +589,28 @@ def estimate_read_time(title: str) -> int:
 # Sentiment Analysis
 # ──────────────────────────────────────────────
 
+def _has_lexicon_token(title: str) -> bool:
+    """Returns False only when VADER is guaranteed to score the title as 0.0.
+
+    VADER assigns valence solely to lexicon words (emoji are first expanded
+    to words), so an ASCII title without any lexicon token scores neutral.
+    """
+    if not title.isascii():
+        return True
+    lexicon = _SIA.lexicon
+    for token in title.lower().split():
+        if token in lexicon or token.strip(string.punctuation) in lexicon:
+            return True
+    return False
+
+
 def analyze_sentiment(title: str) -> dict:
     """Uses VADER to analyze sentiment of a title."""
-    if not _vader_available:
+    if _SIA is None or not _has_lexicon_token(title):
         return {'label': 'neutral', 'score': 0.0}
 
     try:
-        sia = SentimentIntensityAnalyzer()
-        scores = sia.polarity_scores(title)
+        scores = _SIA.polarity_scores(title)
         compound = scores['compound']
 
         if compound >= 0.05:
@@ -430,19 +625,30 @@ def analyze_sentiment(title: str) -> dict:
         return {'label': 'neutral', 'score': 0.0}
 
 
+def bulk_analyze_sentiment(titles: list[str]) -> list[dict]:
+    """Analyzes a batch of titles, scoring each distinct title only once."""
+    scored: dict[str, dict] = {}
+    results = []
+    for title in titles:
+        if title not in scored:
+            scored[title] = analyze_sentiment(title)
+        results.append(scored[title])
+    return results
+
+
 # ──────────────────────────────────────────────
 # Trending Topics (TF-IDF-like word frequency)
 # ──────────────────────────────────────────────
 
-STOP_WORDS = set()
+_nltk_stop_words: set[str] = set()
 try:
     from nltk.corpus import stopwords
-    STOP_WORDS = set(stopwords.words('english'))
+    _nltk_stop_words = set(stopwords.words('english'))
 except LookupError:
     pass
 
-# Additional stop words for tech news
-STOP_WORDS.update({
+# NLTK list plus additional stop words for tech news, frozen once built
+STOP_WORDS = frozenset(_nltk_stop_words | {
     'new', 'says', 'first', 'get', 'one', 'two', 'could', 'would', 'also',
     'may', 'use', 'using', 'make', 'like', 'much', 'us', 'now', 'just',
     'want', 'still', 'year', 'years', 'going', 'big', 'best', 'way',
@@ -450,106 +656,208 @@ STOP_WORDS.update({
     'will', 'can', 'has', 'its', 'it', 'how', 'why', 'what'
 })
 
+_TOPIC_TOKEN_RE = re.compile(r'[a-zA-Z]{3,}')
+
 
 def extract_trending_topics(titles: list[str], limit: int = 10) -> list[dict]:
     """Extracts trending topics from article titles using word frequency."""
     word_counts: Counter = Counter()
+    # Most bigrams occur once; only promote them to the counter on a second sighting
+    single_bigrams: set[str] = set()
 
     for title in titles:
-        words = re.findall(r'[a-zA-Z]{3,}', title.lower())
-        meaningful = [w for w in words if w not in STOP_WORDS and len(w) > 2]
-        word_counts.update(meaningful)
-
-    # Also extract 2-word phrases (bigrams) for better topics
-    for title in titles:
-        words = re.findall(r'[a-zA-Z]{3,}', title.lower())
+        words = _TOPIC_TOKEN_RE.findall(title.lower())
         meaningful = [w for w in words if w not in STOP_WORDS]
-        for i in range(len(meaningful) - 1):
-            bigram = f"{meaningful[i]} {meaningful[i + 1]}"
-            word_counts[bigram] += 1
-
-    topics = []
-    for word, count in word_counts.most_common(limit):
-        if count >= 2:  # Only show if appears 2+ times
-            topics.append({'topic': word, 'count': count})
+        word_counts.update(meaningful)
+        # Also count 2-word phrases (bigrams) for better topics
+        for first, second in zip(meaningful, meaningful[1:]):
+            bigram = f"{first} {second}"
+            if bigram in word_counts:
+                word_counts[bigram] += 1
+            elif bigram in single_bigrams:
+                single_bigrams.discard(bigram)
+                word_counts[bigram] = 2
+            else:
+                single_bigrams.add(bigram)
 
-    return topics
+    # Only show topics that appear 2+ times
+    candidates = ((word, count) for word, count in word_counts.items() if count >= 2)
+    return [{'topic': word, 'count': count}
+            for word, count in heapq.nlargest(limit, candidates, key=itemgetter(1))]
 
 
 # ──────────────────────────────────────────────
 # Background Processing
 # ──────────────────────────────────────────────
 
+def _compute_tags(title: str) -> tuple[str, int]:
+    """Computes (category, read_time) for one title."""
+    return classify_article(title), estimate_read_time(title)
+
+
 def process_articles_metadata():
     """Background job: assigns sentiment, category, and read time to unprocessed articles."""
     unprocessed = db.get_unprocessed_articles(limit=100)
+    if not unprocessed:
+        return
     processed_at = time.time()
-    for article in unprocessed:
-        title = article.get('title', '')
-        sentiment = analyze_sentiment(title)
-        category = classify_article(title)
-        read_time = estimate_read_time(title)
-
-        db.update_article_metadata(
-            article_id=article['id'],
-            sentiment=sentiment['label'],
-            sentiment_score=sentiment['score'],
-            category=category,
-            read_time=read_time,
-            metadata_processed_at=processed_at
-        )
-    if unprocessed:
-        logger.info(f"Processed metadata for {len(unprocessed)} articles")
+
+    titles = [article.get('title', '') for article in unprocessed]
+    sentiments = bulk_analyze_sentiment(titles)
+
+    # Keyword matching and word counts take microseconds per title; a pool would cost more than it saves
+    tags = [_compute_tags(title) for title in titles]
+
+    rows = [
+        (sentiment['label'], sentiment['score'], category, read_time, processed_at, article['id'])
+        for article, sentiment, (category, read_time) in zip(unprocessed, sentiments, tags)
+    ]
+    db.update_article_metadata_bulk(rows)
+    logger.info(f"Processed metadata for {len(unprocessed)} articles")
+
+
+# One scrape at a time per process: a refresh that arrives mid-scrape waits for it
+# instead of fanning out to every source again
+_scrape_lock = threading.Lock()
+
+
+def scrape_and_store(hn_pages: int = 1, force: bool = True) -> Optional[tuple[int, int]]:
+    """Scrapes all sources and saves to DB; returns (inserted, scraped), or None if it joined a running scrape."""
+    if not _scrape_lock.acquire(blocking=False):
+        with _scrape_lock:  # the running scrape's rows are in the DB once this returns
+            return None
+    try:
+        agg = get_aggregator()
+        agg.scrape_all(hn_pages=hn_pages, force=force)
+        publish_source_health(agg)
+        new_articles = agg.get_articles()
+        if not new_articles:
+            return 0, 0
+        inserted = db.add_articles(new_articles)
+        db.upsert_images(new_articles)
+        # Process metadata for new articles
+        process_articles_metadata()
+        return inserted, len(new_articles)
+    finally:
+        _scrape_lock.release()
 
 
 def background_scrape():
     """Background job: scrapes all sources and saves to DB."""
     logger.info("[Scheduler] Running background scrape...")
     try:
-        agg = get_aggregator()
-        agg.scrape_all(hn_pages=1, force=True)
-        new_articles = agg.get_articles()
-        if new_articles:
-            db.add_articles(new_articles)
-            db.upsert_images(new_articles)
-            logger.info(f"[Scheduler] Added {len(new_articles)} articles")
-            # Process metadata for new articles
-            process_articles_metadata()
+        result = scrape_and_store(hn_pages=1, force=True)
+        if result is None:
+            logger.info("[Scheduler] Joined a scrape already in progress")
+        else:
+            inserted, scraped = result
+            logger.info(f"[Scheduler] Added {inserted} new of {scraped} scraped articles")
     except Exception as e:
         logger.error(f"[Scheduler] Scrape failed: {e}")
 
 
+# FTS5 optimize rewrites the whole index, so it is opt-in and runs off-peak
+FTS_OPTIMIZE = os.getenv('FTS_OPTIMIZE', 'false').lower() == 'true'
+FTS_OPTIMIZE_HOUR = int(os.getenv('FTS_OPTIMIZE_HOUR', '4'))
+
+
+def optimize_search_index():
+    """Background job: checks and merges the full-text search index."""
+    if db.optimize_fts():
+        logger.info("[Scheduler] Search index optimized")
+
+
 # ──────────────────────────────────────────────
 # Routes
 # ──────────────────────────────────────────────
 
+CSV_FIELDS = ('title', 'score', 'link', 'author', 'time', 'comments', 'source', 'category', 'sentiment')
+CSV_FLUSH_ROWS = 256
+CSV_GZIP_LEVEL = 1  # cheap on CPU, still catches most of the size win on CSV
+CSV_CACHE_SIZE = 16
+
+# Rendered CSV bodies keyed by (data version, keyword, sort_by, gzip)
+_csv_cache: OrderedDict[tuple, bytes] = OrderedDict()
+_csv_cache_lock = threading.Lock()
+
+
+def _gzip_stream(chunks):
+    """Gzips a stream of byte chunks, emitting one sync-flushed frame per chunk."""
+    compressor = zlib.compressobj(CSV_GZIP_LEVEL, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _cache_stream(key: tuple, chunks):
+    """Passes chunks through and caches the full body once the stream completes."""
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    with _csv_cache_lock:
+        _csv_cache[key] = b''.join(parts)
+        _csv_cache.move_to_end(key)
+        while len(_csv_cache) > CSV_CACHE_SIZE:
+            _csv_cache.popitem(last=False)
+
+
 @app.route('/download')
 def download_csv() -> ResponseReturnValue:
     """Generates and downloads a CSV file of the articles."""
     sort_by = normalize_sort_by(request.args.get('sort', 'score'))
     keyword = sanitize_keyword(request.args.get('keyword', ''))
 
-    articles = db.get_articles(limit=500, keyword=keyword, sort_by=sort_by)
+    use_gzip = bool(request.accept_encodings['gzip'])
+    headers = {'Content-Disposition': 'attachment;filename=tech_news.csv', 'Vary': 'Accept-Encoding'}
+    if use_gzip:
+        headers['Content-Encoding'] = 'gzip'
+
+    # Unchanged data + same filters -> same bytes, so the key doubles as a strong ETag
+    key = (db.get_data_version(), keyword, sort_by, use_gzip)
+    etag = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = Response(status=304, headers={'Vary': 'Accept-Encoding'})
+        response.set_etag(etag)
+        return response
+
+    with _csv_cache_lock:
+        cached = _csv_cache.get(key)
+        if cached is not None:
+            _csv_cache.move_to_end(key)
+    if cached is not None:
+        response = Response(cached, mimetype='text/csv', headers=headers)
+        response.set_etag(etag)
+        return response.make_conditional(request, accept_ranges=True, complete_length=len(cached))
 
     def generate():
         output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=[
-            'title', 'score', 'link', 'author', 'time', 'comments', 'source', 'category', 'sentiment'
-        ], extrasaction='ignore')
-        writer.writeheader()
-        yield output.getvalue()
-        output.seek(0)
-        output.truncate(0)
+        writer = csv.writer(output)
+        writer.writerow(CSV_FIELDS)
 
-        for article in articles:
-            writer.writerow(article)
-            yield output.getvalue()
-            output.seek(0)
-            output.truncate(0)
+        # Flush in batches rather than yielding one tiny chunk per row
+        batch = []
+        for article in db.iter_articles(limit=500, keyword=keyword, sort_by=sort_by):
+            batch.append(tuple(article.get(field, '') for field in CSV_FIELDS))
+            if len(batch) >= CSV_FLUSH_ROWS:
+                writer.writerows(batch)
+                batch.clear()
+                yield output.getvalue().encode('utf-8')
+                output.seek(0)
+                output.truncate(0)
 
-    return Response(stream_with_context(generate()),
-                    mimetype='text/csv',
-                    headers={'Content-Disposition': 'attachment;filename=tech_news.csv'})
+        writer.writerows(batch)
+        yield output.getvalue().encode('utf-8')
+
+    body = generate()
+    if use_gzip:
+        body = _gzip_stream(body)
+
+    response = Response(stream_with_context(_cache_stream(key, body)), mimetype='text/csv', headers=headers)
+    response.set_etag(etag)
+    return response
 
 
 @app.route('/saved')
@@ -560,8 +868,7 @@ def saved_articles():
     per_page = 30
     offset = (page - 1) * per_page
 
-    articles = db.get_articles(limit=per_page, offset=offset, saved_only=True, sort_by=sort_by)
-    total = db.get_total_count(saved_only=True)
+    articles, total = db.get_articles_page(limit=per_page, offset=offset, saved_only=True, sort_by=sort_by)
     total_pages = max(1, (total + per_page - 1) // per_page)
     stats = db.get_stats()
 
@@ -599,35 +906,27 @@ def index():
 
             if should_scrape:
                 logger.info("Scraping fresh data and saving to DB...")
-                agg = get_aggregator()
-                agg.scrape_all(hn_pages=pages, force=force_refresh)
-                new_articles = agg.get_articles()
-                db.add_articles(new_articles)
-                db.upsert_images(new_articles)
-                # Process metadata for new articles
-                process_articles_metadata()
+                scrape_and_store(hn_pages=pages, force=force_refresh)
             else:
                 logger.info("Querying existing data...")
 
     except Exception as e:
         logger.error(f"Error during scrape/filter: {e}")
 
-    # Fetch articles with pagination
-    articles = db.get_articles(
+    # Fetch one page of articles and the filtered total in a single query
+    articles, total = db.get_articles_page(
         limit=per_page, offset=offset,
         source_filter=source_filter, keyword=keyword,
         category=category_filter,
         sort_by=sort_by
     )
-
-    total = db.get_total_count(source_filter=source_filter, keyword=keyword, category=category_filter)
     total_pages = max(1, (total + per_page - 1) // per_page)
 
     # Get stats
     stats = db.get_stats()
 
     # Source health
-    health = get_aggregator().get_health()
+    health = get_source_health()
 
     return render_template('index.html',
                            articles=articles,
@@ -725,17 +1024,45 @@ def api_search() -> ResponseReturnValue:
     if not query:
         return jsonify({'error': 'Search query required'}), 400
 
-    results = db.search_articles(query, limit=50)
+    source_filter = normalize_source_filter(request.args.get('source', 'all'))
+    category_filter = normalize_category_filter(request.args.get('category', 'all'))
+    results = db.search_articles(query, limit=50, source_filter=source_filter, category=category_filter)
     return jsonify({'results': results, 'count': len(results)})
 
 
+@app.route('/api/articles')
+def api_articles() -> ResponseReturnValue:
+    """Keyset-paginated articles; pass next_cursor back as ?cursor= for the following page."""
+    sort_by = normalize_sort_by(request.args.get('sort', 'score'))
+    source_filter = normalize_source_filter(request.args.get('source', 'all'))
+    category_filter = normalize_category_filter(request.args.get('category', 'all'))
+    keyword = sanitize_keyword(request.args.get('keyword', ''))
+    limit = parse_bounded_int(request.args.get('limit', 30), default=30, minimum=1, maximum=100)
+
+    after = None
+    token = request.args.get('cursor', '')
+    if token:
+        after = decode_cursor(token)
+        if after is None:
+            return jsonify({'error': 'Invalid cursor'}), 400
+
+    try:
+        articles = db.get_articles(limit=limit, source_filter=source_filter, keyword=keyword,
+                                   category=category_filter, sort_by=sort_by, after=after)
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+
+    next_cursor = encode_cursor(db.keyset_cursor(articles[-1], sort_by)) if len(articles) == limit else None
+    return jsonify({'articles': articles, 'next_cursor': next_cursor})
+
+
 
 
 
 @app.route('/api/health')
 def api_health() -> ResponseReturnValue:
     """Returns scraper health status for all sources."""
-    return jsonify({'sources': get_aggregator().get_health()})
+    return jsonify({'sources': get_source_health()})
 
 
 @app.route('/api/personalized')
@@ -745,6 +1072,125 @@ def api_personalized() -> ResponseReturnValue:
     return jsonify({'articles': articles})
 
 
+SUMMARY_MAX_BYTES = 2 * 1024 * 1024
+SUMMARY_MAX_REDIRECTS = 5
+SUMMARY_TIMEOUT = (3, 10)  # (connect, read) seconds
+SUMMARY_CACHE_TTL = 24 * 60 * 60
+SUMMARY_WORKERS = int(os.environ.get('SUMMARY_WORKERS', '2'))
+SUMMARY_EXTRACT_TIMEOUT = 30
+
+_summary_pool: Optional[ProcessPoolExecutor] = None
+_summary_pool_lock = threading.Lock()
+# Pool -> queue its workers put their PIDs on, so a stuck pool can be killed
+_summary_worker_pids: dict[ProcessPoolExecutor, Any] = {}
+
+# One pooled session for all summary fetches instead of a fresh connection per call
+_summary_session = requests.Session()
+_summary_session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=50))
+_summary_session.mount('http://', HTTPAdapter(pool_connections=10, pool_maxsize=50))
+_summary_session.headers['User-Agent'] = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+)
+
+
+class SummaryFetchError(Exception):
+    """Raised when a page cannot be fetched for summarization."""
+
+
+def _fetch_page(url: str) -> bytes:
+    """Fetches a page body, re-validating every redirect hop against is_safe_url."""
+    for _ in range(SUMMARY_MAX_REDIRECTS + 1):
+        with _summary_session.get(url, timeout=SUMMARY_TIMEOUT, stream=True,
+                                  allow_redirects=False) as resp:
+            if resp.is_redirect:
+                url = urljoin(url, resp.headers['Location'])
+                if not is_safe_url(url):
+                    raise SummaryFetchError('Redirect target not allowed')
+                continue
+            if resp.status_code != 200:
+                raise SummaryFetchError(f'Upstream returned {resp.status_code}')
+            return resp.raw.read(SUMMARY_MAX_BYTES, decode_content=True)
+    raise SummaryFetchError('Too many redirects')
+
+
+def _get_summary_pool() -> ProcessPoolExecutor:
+    """Lazily starts the extraction pool on first use."""
+    global _summary_pool
+    with _summary_pool_lock:
+        if _summary_pool is None:
+            # spawn keeps children from inheriting the scheduler/SMTP threads of this worker
+            context = multiprocessing.get_context('spawn')
+            pid_queue = context.SimpleQueue()
+            _summary_pool = ProcessPoolExecutor(max_workers=SUMMARY_WORKERS, mp_context=context,
+                                                initializer=load_extractor, initargs=(pid_queue,))
+            _summary_worker_pids[_summary_pool] = pid_queue
+        return _summary_pool
+
+
+def _discard_summary_pool(pool: ProcessPoolExecutor) -> None:
+    """Drops a broken or stuck pool and ends its processes; the next request starts a new one."""
+    global _summary_pool
+    # Swap the global first so no new request picks up the pool being torn down
+    with _summary_pool_lock:
+        if _summary_pool is pool:
+            _summary_pool = None
+        pid_queue = _summary_worker_pids.pop(pool, None)
+    if pid_queue is None:  # another request already discarded it
+        return
+    pool.shutdown(wait=False, cancel_futures=True)
+    # shutdown() never interrupts a running task; stop the workers by the PIDs they reported
+    while not pid_queue.empty():
+        try:
+            os.kill(pid_queue.get(), signal.SIGTERM)
+        except OSError:  # already exited
+            pass
+    pid_queue.close()
+
+
+def _shutdown_summary_pool() -> None:
+    pool = _summary_pool
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(_shutdown_summary_pool)
+
+
+def _submit_extraction(downloaded: bytes) -> tuple[ProcessPoolExecutor, Future]:
+    """Submits to the current pool, retrying once if it was discarded under us."""
+    pool = _get_summary_pool()
+    try:
+        return pool, pool.submit(extract_summary, downloaded)
+    except BrokenProcessPool:
+        _discard_summary_pool(pool)
+        raise
+    except RuntimeError:  # shut down by a concurrent _discard_summary_pool
+        pool = _get_summary_pool()
+        return pool, pool.submit(extract_summary, downloaded)
+
+
+def summarize_url(url: str) -> dict[str, str]:
+    """Fetches a URL and extracts its summary in the worker pool."""
+    downloaded = _fetch_page(url)
+    if not downloaded:
+        raise SummaryFetchError('Empty response')
+
+    # Extraction is CPU-bound; a separate process keeps it off this worker's GIL
+    pool = None
+    try:
+        pool, future = _submit_extraction(downloaded)
+        return future.result(timeout=SUMMARY_EXTRACT_TIMEOUT)
+    except TimeoutError:
+        # A runaway extraction would hold its worker slot for good
+        if not future.cancel():
+            _discard_summary_pool(pool)
+        raise
+    except BrokenProcessPool:
+        if pool is not None:  # a failed submit already discarded its pool
+            _discard_summary_pool(pool)
+        raise
+
+
 @app.route('/api/summarize', methods=['POST'])
 @rate_limit("20 per minute")
 def summarize() -> ResponseReturnValue:
@@ -764,40 +1210,22 @@ def summarize() -> ResponseReturnValue:
     if not is_safe_url(url):
         return jsonify({'error': 'URL not allowed'}), 400
 
-    try:
-        import trafilatura
-        downloaded = trafilatura.fetch_url(url, timeout=10)
-        if not downloaded:
-            return jsonify({'error': 'Failed to fetch URL'}), 500
-
-        # Extract main content
-        result = trafilatura.extract(
-            downloaded,
-            include_comments=False,
-            include_tables=False,
-            include_images=False,
-            output_format='json',
-            with_metadata=True
-        )
-        
-        if result:
-            import json
-            data = json.loads(result)
-            title = data.get('title', '')
-            summary = data.get('excerpt', data.get('raw_text', ''))[:500]
-            image = data.get('image', '')
-        else:
-            # Fallback: extract text only
-            text = trafilatura.extract(downloaded, include_comments=False, include_tables=False)
-            title = ''
-            summary = text[:500] if text else 'Could not extract content'
-            image = ''
+    # Summaries are cached in the DB so repeat URLs skip the fetch across restarts and workers
+    url_hash = hashlib.blake2b(url.encode(), digest_size=16).hexdigest()
+    cached = db.get_summary(url_hash, SUMMARY_CACHE_TTL)
+    if cached is not None:
+        return jsonify(cached)
 
-        return jsonify({
-            'title': title,
-            'summary': summary,
-            'top_image': image
-        })
+    try:
+        result = summarize_url(url)
+        db.save_summary(url_hash, result, SUMMARY_CACHE_TTL)
+        return jsonify(result)
+    except (SummaryFetchError, requests.RequestException) as e:
+        logger.warning(f"Failed to fetch {url}: {e}")
+        return jsonify({'error': 'Failed to fetch URL'}), 500
+    except TimeoutError:
+        logger.warning(f"Summarizing {url} timed out after {SUMMARY_EXTRACT_TIMEOUT}s")
+        return jsonify({'error': 'Summarization timed out'}), 504
     except Exception as e:
         logger.warning(f"Failed to summarize {url}: {e}")
         return jsonify({'error': f"Failed to summarize: {str(e)}"}), 500
@@ -806,16 +1234,14 @@ def summarize() -> ResponseReturnValue:
 @app.route('/export/json')
 def export_json() -> ResponseReturnValue:
     """Exports bookmarked articles as JSON download."""
-    json_data = db.export_bookmarks_json()
-    return Response(json_data, mimetype='application/json',
+    return Response(stream_with_context(db.export_bookmarks_json()), mimetype='application/json',
                     headers={'Content-Disposition': 'attachment;filename=bookmarks.json'})
 
 
 @app.route('/export/markdown')
 def export_markdown() -> ResponseReturnValue:
     """Exports bookmarked articles as Markdown download."""
-    md_data = db.export_bookmarks_markdown()
-    return Response(md_data, mimetype='text/markdown',
+    return Response(stream_with_context(db.export_bookmarks_markdown()), mimetype='text/markdown',
                     headers={'Content-Disposition': 'attachment;filename=bookmarks.md'})
 
 
@@ -850,6 +1276,49 @@ def test_webhook() -> ResponseReturnValue:
         return jsonify({'error': str(e)}), 500
 
 
+# smtplib.SMTP is not thread-safe: one shared connection, used under a lock
+_smtp_lock = threading.Lock()
+_smtp_conn: Optional[smtplib.SMTP] = None
+_smtp_key: Optional[tuple[str, int, str]] = None
+
+
+def _close_smtp() -> None:
+    global _smtp_conn
+    if _smtp_conn is not None:
+        try:
+            _smtp_conn.quit()
+        except smtplib.SMTPException:
+            pass
+        _smtp_conn = None
+
+
+def _send_smtp_message(host: str, port: int, user: str, password: str, msg: MIMEText) -> None:
+    """Sends msg over a reused SMTP connection, reconnecting once if it was dropped."""
+    global _smtp_conn, _smtp_key
+    with _smtp_lock:
+        for attempt in range(2):
+            if _smtp_conn is None or _smtp_key != (host, port, user):
+                _close_smtp()
+                conn = smtplib.SMTP(host, port, timeout=30)
+                try:
+                    conn.starttls()
+                    conn.login(user, password)
+                except smtplib.SMTPException:
+                    conn.close()
+                    raise
+                _smtp_conn, _smtp_key = conn, (host, port, user)
+            try:
+                _smtp_conn.send_message(msg)
+                return
+            except smtplib.SMTPServerDisconnected:
+                _smtp_conn = None
+                if attempt:
+                    raise
+
+
+atexit.register(_close_smtp)
+
+
 @app.route('/api/email/digest', methods=['POST'])
 def send_email_digest() -> ResponseReturnValue:
     """Sends an email digest of top articles.
@@ -875,22 +1344,19 @@ def send_email_digest() -> ResponseReturnValue:
 
     # Build digest content
     articles = db.get_articles(limit=10)
-    digest_lines = ["<h2>📰 Your Tech News Digest</h2><ul>"]
-    for a in articles:
-        digest_lines.append(f"<li><a href='{a.get('link')}'>{a.get('title')}</a> [{a.get('source')}]</li>")
-    digest_lines.append("</ul>")
-
-    body = '\n'.join(digest_lines)
+    # Article fields come from scraped feeds, so escape them before embedding in HTML
+    body = "<h2>📰 Your Tech News Digest</h2><ul>" + ''.join(
+        f"<li><a href=\"{escape(a.get('link', ''))}\">{escape(a.get('title', ''))}</a>"
+        f" [{escape(a.get('source', ''))}]</li>"
+        for a in articles
+    ) + "</ul>"
     msg = MIMEText(body, 'html')
     msg['Subject'] = 'Your Daily Tech News Digest'
     msg['From'] = smtp_user
     msg['To'] = recipient
 
     try:
-        with smtplib.SMTP(smtp_host, smtp_port) as server:
-            server.starttls()
-            server.login(smtp_user, smtp_pass)
-            server.send_message(msg)
+        _send_smtp_message(smtp_host, smtp_port, smtp_user, smtp_pass, msg)
         return jsonify({'status': 'Digest sent successfully'})
     except Exception as e:
         logger.error(f"Email send failed: {e}")
@@ -928,6 +1394,34 @@ def service_worker():
 # ──────────────────────────────────────────────
 
 scheduler = None
+_scheduler_lock = None
+
+# Defaults sit next to app.py rather than in whatever directory the server was started from
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+# Jobs are re-added with replace_existing=True on every start, so the store carries no
+# state across restarts; it only lets other processes see the scheduled jobs.
+SCHEDULER_JOBSTORE_URL = os.getenv('SCHEDULER_JOBSTORE_URL',
+                                   f"sqlite:///{os.path.join(_APP_DIR, 'jobs.db')}")
+SCHEDULER_LOCK_FILE = os.getenv('SCHEDULER_LOCK_FILE', os.path.join(_APP_DIR, 'scheduler.lock'))
+
+
+def _acquire_scheduler_lock() -> bool:
+    """Takes a non-blocking file lock so only one worker process runs the scheduler."""
+    global _scheduler_lock
+    if fcntl is None:
+        return True
+
+    lock_file = open(SCHEDULER_LOCK_FILE, 'w')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+
+    lock_file.write(str(os.getpid()))
+    lock_file.flush()
+    _scheduler_lock = lock_file  # keep the handle open; the lock lives as long as this process
+    return True
 
 
 def stop_scheduler() -> None:
@@ -952,9 +1446,21 @@ def start_scheduler() -> None:
     if scheduler and scheduler.running:
         return
 
-    scheduler = BackgroundScheduler()
+    if not _acquire_scheduler_lock():
+        logger.info("Background scheduler already running in another worker")
+        return
+
+    if _sqlalchemy_jobstore_available:
+        scheduler = BackgroundScheduler(
+            jobstores={'default': SQLAlchemyJobStore(url=SCHEDULER_JOBSTORE_URL)})
+    else:
+        logger.warning("SQLAlchemy not available. Using in-memory job store.")
+        scheduler = BackgroundScheduler()
     scheduler.add_job(background_scrape, 'interval', minutes=15, id='scrape_job',
                       replace_existing=True, max_instances=1)
+    if FTS_OPTIMIZE:
+        scheduler.add_job(optimize_search_index, 'cron', hour=FTS_OPTIMIZE_HOUR, id='fts_optimize_job',
+                          replace_existing=True, max_instances=1)
     scheduler.start()
     atexit.register(stop_scheduler)
     logger.info("Background scheduler started (scraping every 15 minutes)")
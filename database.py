@@ -5,27 +5,94 @@ pagination, reading list, and export features.
 Supports both SQLite (local) and PostgreSQL (production).
 """
 import os
+import queue
 import sqlite3
+import textwrap
 import time
 import json
 import logging
 from contextlib import contextmanager
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from urllib.parse import urlparse
 
 logger = logging.getLogger(__name__)
 
+# WAL and mmap need shared memory that network filesystems (e.g. PythonAnywhere's
+# home directories) don't reliably provide; set SQLITE_WAL=false there.
+SQLITE_WAL = os.getenv('SQLITE_WAL', 'true').lower() == 'true'
+
+
+def _dict_row(cursor: sqlite3.Cursor, row: Tuple[Any, ...]) -> Dict[str, Any]:
+    """Row factory that builds plain dicts directly, skipping sqlite3.Row + dict()."""
+    return dict(zip([col[0] for col in cursor.description], row))
+
+
+def _coerce_count(value: Any) -> int:
+    """Coerces a score/comment count to a non-negative int; non-numeric values become 0."""
+    if isinstance(value, bool):
+        return 0
+    if isinstance(value, int):
+        return max(value, 0)
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return 0
+
 
 class Database:
+    METADATA_BATCH_SIZE = 500  # rows per executemany call
+    SQLITE_POOL_SIZE = 8  # idle SQLite connections kept for reuse
+    EXPORT_LIMIT = 1000  # max bookmarks per export
+    STREAM_BATCH_SIZE = 200  # rows per fetchmany() when streaming
+    # Descending sort columns per sort key, each backed by an index; anything else sorts
+    # newest first. Ties break on id ASC, the rowid order already inside those indexes.
+    SORT_COLUMNS = {
+        'score': ('score', 'created_at'),
+        'comments': ('comments_count', 'created_at'),
+        'newest': ('created_at',),
+    }
+    # Per-connection SQLite tuning; journal_mode persists in the file, so init_db sets it once
+    SQLITE_PRAGMAS = (
+        "PRAGMA busy_timeout = 5000",
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA cache_size = -20000",
+    )
+    # Only applied while the file is in WAL mode
+    SQLITE_WAL_PRAGMAS = (
+        "PRAGMA synchronous = NORMAL",  # durable under WAL, one fsync per checkpoint instead of per commit
+        "PRAGMA mmap_size = 268435456",
+    )
+
     def __init__(self, db_name: str = "sniffer.db") -> None:
         self.db_name = db_name
         self._use_postgres = bool(os.getenv("DATABASE_URL"))
+        self._sqlite_wal = SQLITE_WAL
+        self._title_trigram = False  # set by init_db when SQLite has the FTS5 trigram tokenizer
         self._pg_pool = None
+        self._sqlite_pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=self.SQLITE_POOL_SIZE)
         self.init_db()
 
+    def _dict_cursor(self, conn):
+        """Cursor yielding plain dicts on SQLite; Postgres keeps its default cursor."""
+        cursor = conn.cursor()
+        if not self._use_postgres:
+            cursor.row_factory = _dict_row
+        return cursor
+
+    def _connect_sqlite(self) -> sqlite3.Connection:
+        """Opens a tuned SQLite connection that may be handed between request threads."""
+        conn = sqlite3.connect(self.db_name, timeout=15, check_same_thread=False)
+        for pragma in self.SQLITE_PRAGMAS:
+            conn.execute(pragma)
+        if self._sqlite_wal:
+            for pragma in self.SQLITE_WAL_PRAGMAS:
+                conn.execute(pragma)
+        conn.row_factory = sqlite3.Row
+        return conn
+
     @contextmanager
     def get_connection(self):
-        """Context manager that auto-closes the DB connection."""
+        """Context manager that borrows a pooled DB connection and returns it afterwards."""
         if self._use_postgres:
             import psycopg2
             from psycopg2.pool import SimpleConnectionPool
@@ -42,13 +109,20 @@ class Database:
             finally:
                 self._pg_pool.putconn(conn)
         else:
-            conn = sqlite3.connect(self.db_name, timeout=15)
-            conn.execute("PRAGMA busy_timeout = 5000")
-            conn.row_factory = sqlite3.Row
+            # LIFO reuse keeps the most recently used (warmest) connection in play
+            try:
+                conn = self._sqlite_pool.get_nowait()
+            except queue.Empty:
+                conn = self._connect_sqlite()
             try:
                 yield conn
             finally:
-                conn.close()
+                if conn.in_transaction:
+                    conn.rollback()  # never hand a half-finished transaction to the next caller
+                try:
+                    self._sqlite_pool.put_nowait(conn)
+                except queue.Full:
+                    conn.close()
 
     def init_db(self) -> None:
         """Initializes the database table and ensures schema is up to date."""
@@ -66,6 +140,7 @@ class Database:
                         author TEXT,
                         time_posted TEXT,
                         comments TEXT,
+                        comments_count INTEGER DEFAULT 0,
                         source TEXT,
                         created_at REAL,
                         is_saved INTEGER DEFAULT 0,
@@ -79,6 +154,8 @@ class Database:
                         image_url TEXT DEFAULT ''
                     )
                 ''')
+                cursor.execute("ALTER TABLE articles ADD COLUMN IF NOT EXISTS comments_count INTEGER DEFAULT 0")
+
                 # Create indexes for PostgreSQL
                 indexes = [
                     "CREATE INDEX IF NOT EXISTS idx_articles_source ON articles(source)",
@@ -91,6 +168,10 @@ class Database:
                     "CREATE INDEX IF NOT EXISTS idx_articles_category_created ON articles(category, created_at DESC)",
                     "CREATE INDEX IF NOT EXISTS idx_articles_saved_created ON articles(is_saved, created_at DESC)",
                     "CREATE INDEX IF NOT EXISTS idx_articles_read_created ON articles(is_read, created_at DESC)",
+                    "CREATE INDEX IF NOT EXISTS idx_articles_score_created ON articles(score DESC, created_at DESC)",
+                    "CREATE INDEX IF NOT EXISTS idx_articles_comments_created ON articles(comments_count DESC, created_at DESC)",
+                    "CREATE INDEX IF NOT EXISTS idx_articles_source_score ON articles(source, score DESC, created_at DESC)",
+                    "CREATE INDEX IF NOT EXISTS idx_articles_source_comments ON articles(source, comments_count DESC, created_at DESC)",
                 ]
                 for idx in indexes:
                     cursor.execute(idx)
@@ -98,6 +179,18 @@ class Database:
                 # FTS not directly supported in PG same way, use tsvector/tsquery or pg_trgm
                 # For now, we'll rely on ILIKE with indexes
             else:
+                # WAL lets readers run alongside the scheduler's writes
+                if self._sqlite_wal:
+                    cursor.execute("PRAGMA journal_mode = WAL")
+                    if cursor.fetchone()[0].lower() != 'wal':
+                        logger.warning("SQLite could not enable WAL; using the rollback journal")
+                        self._sqlite_wal = False
+                        cursor.execute("PRAGMA synchronous = FULL")
+                        cursor.execute("PRAGMA mmap_size = 0")
+                else:
+                    # Undo WAL left in the file by an earlier run
+                    cursor.execute("PRAGMA journal_mode = DELETE")
+
                 # SQLite schema
                 cursor.execute('''
                     CREATE TABLE IF NOT EXISTS articles (
@@ -108,6 +201,7 @@ class Database:
                         author TEXT,
                         time_posted TEXT,
                         comments TEXT,
+                        comments_count INTEGER DEFAULT 0,
                         source TEXT,
                         created_at REAL,
                         is_saved INTEGER DEFAULT 0,
@@ -133,15 +227,23 @@ class Database:
                     ("metadata_processed_at", "REAL"),
                     ("excerpt", "TEXT DEFAULT ''"),
                     ("image_url", "TEXT DEFAULT ''"),
+                    ("comments_count", "INTEGER DEFAULT 0"),
                 ]
+                cursor.execute("PRAGMA table_info(articles)")
+                existing_columns = {row[1] for row in cursor.fetchall()}
                 for col_name, col_type in migrations:
-                    try:
-                        cursor.execute(f"SELECT {col_name} FROM articles LIMIT 1")
-                    except sqlite3.OperationalError:
+                    if col_name not in existing_columns:
                         logger.info(f"Migrating DB: Adding '{col_name}' column...")
                         cursor.execute(f"ALTER TABLE articles ADD COLUMN {col_name} {col_type}")
+                        if col_name == 'comments_count':
+                            cursor.execute(
+                                "UPDATE articles SET comments_count = CAST(comments AS INTEGER) "
+                                "WHERE comments GLOB '[0-9]*'"
+                            )
 
                 # FTS5 virtual table for full-text search
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'articles_fts'")
+                fts_existed = cursor.fetchone() is not None
                 cursor.execute('''
                     CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
                         title, author, source, excerpt,
@@ -149,6 +251,9 @@ class Database:
                         content_rowid='id'
                     )
                 ''')
+                if not fts_existed:
+                    # Index rows that predate the FTS table; the triggers only cover new writes
+                    cursor.execute("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
 
                 # Triggers to keep FTS in sync
                 cursor.execute('''
@@ -163,8 +268,15 @@ class Database:
                         VALUES ('delete', old.id, old.title, old.author, old.source, old.excerpt);
                     END
                 ''')
+                # Only indexed columns re-index a row; metadata, image, and flag writes skip FTS.
+                # Replace the older unconditional trigger on existing databases.
+                cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'articles_au'")
+                au_trigger = cursor.fetchone()
+                if au_trigger and 'UPDATE OF' not in au_trigger[0]:
+                    cursor.execute("DROP TRIGGER articles_au")
                 cursor.execute('''
-                    CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE ON articles BEGIN
+                    CREATE TRIGGER IF NOT EXISTS articles_au
+                    AFTER UPDATE OF title, author, source, excerpt ON articles BEGIN
                         INSERT INTO articles_fts(articles_fts, rowid, title, author, source, excerpt)
                         VALUES ('delete', old.id, old.title, old.author, old.source, old.excerpt);
                         INSERT INTO articles_fts(rowid, title, author, source, excerpt)
@@ -172,6 +284,44 @@ class Database:
                     END
                 ''')
 
+                # Trigram index over titles for the keyword filter: it serves LIKE '%kw%'
+                # (mid-word, punctuation such as C++ or .NET) from the index. Needs SQLite 3.34+.
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'articles_title_trgm'")
+                trgm_existed = cursor.fetchone() is not None
+                try:
+                    cursor.execute('''
+                        CREATE VIRTUAL TABLE IF NOT EXISTS articles_title_trgm USING fts5(
+                            title,
+                            content='articles',
+                            content_rowid='id',
+                            tokenize='trigram'
+                        )
+                    ''')
+                    self._title_trigram = True
+                except sqlite3.OperationalError as e:
+                    logger.warning(f"Trigram title index unavailable, keyword filter scans titles: {e}")
+                if self._title_trigram:
+                    if not trgm_existed:
+                        cursor.execute("INSERT INTO articles_title_trgm(articles_title_trgm) VALUES ('rebuild')")
+                    cursor.execute('''
+                        CREATE TRIGGER IF NOT EXISTS articles_trgm_ai AFTER INSERT ON articles BEGIN
+                            INSERT INTO articles_title_trgm(rowid, title) VALUES (new.id, new.title);
+                        END
+                    ''')
+                    cursor.execute('''
+                        CREATE TRIGGER IF NOT EXISTS articles_trgm_ad AFTER DELETE ON articles BEGIN
+                            INSERT INTO articles_title_trgm(articles_title_trgm, rowid, title)
+                            VALUES ('delete', old.id, old.title);
+                        END
+                    ''')
+                    cursor.execute('''
+                        CREATE TRIGGER IF NOT EXISTS articles_trgm_au AFTER UPDATE OF title ON articles BEGIN
+                            INSERT INTO articles_title_trgm(articles_title_trgm, rowid, title)
+                            VALUES ('delete', old.id, old.title);
+                            INSERT INTO articles_title_trgm(rowid, title) VALUES (new.id, new.title);
+                        END
+                    ''')
+
                 # SQLite indexes
                 indexes = [
                     "CREATE INDEX IF NOT EXISTS idx_articles_source ON articles(source)",
@@ -184,10 +334,39 @@ class Database:
                     "CREATE INDEX IF NOT EXISTS idx_articles_category_created ON articles(category, created_at DESC)",
                     "CREATE INDEX IF NOT EXISTS idx_articles_saved_created ON articles(is_saved, created_at DESC)",
                     "CREATE INDEX IF NOT EXISTS idx_articles_read_created ON articles(is_read, created_at DESC)",
+                    "CREATE INDEX IF NOT EXISTS idx_articles_score_created ON articles(score DESC, created_at DESC)",
+                    "CREATE INDEX IF NOT EXISTS idx_articles_comments_created ON articles(comments_count DESC, created_at DESC)",
+                    "CREATE INDEX IF NOT EXISTS idx_articles_source_score ON articles(source, score DESC, created_at DESC)",
+                    "CREATE INDEX IF NOT EXISTS idx_articles_source_comments ON articles(source, comments_count DESC, created_at DESC)",
                 ]
                 for idx in indexes:
                     cursor.execute(idx)
 
+                # Several indexes share a leading column; give the planner stats to choose
+                # between them. Full (sampled) ANALYZE the first time, cheap optimize after.
+                cursor.execute("PRAGMA analysis_limit = 400")
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+                cursor.execute("ANALYZE" if cursor.fetchone() is None else "PRAGMA optimize")
+
+            # Cached /api/summarize results (same DDL on both backends)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS summaries (
+                    url_hash TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            ''')
+
+            # Last scrape health per source, shared by every app worker
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS source_health (
+                    source TEXT PRIMARY KEY,
+                    position INTEGER NOT NULL,
+                    payload TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            ''')
+
             conn.commit()
 
     # ──────────────────────────────────────────────
@@ -202,58 +381,59 @@ class Database:
         """Return single parameter placeholder for current DB."""
         return '%s' if self._use_postgres else '?'
 
-    def _cast_int(self, col: str) -> str:
-        return f"CAST({col} AS INTEGER)" if self._use_postgres else f"CAST({col} AS INTEGER)"
-
     def _date_trunc_day(self, col: str) -> str:
         if self._use_postgres:
             return f"DATE({col})"
         return f"date({col}, 'unixepoch')"
 
-    def _glob(self, col: str, pattern: str) -> str:
-        if self._use_postgres:
-            return f"{col} ~ '{pattern}'"
-        return f"{col} GLOB '{pattern}'"
-
     # ──────────────────────────────────────────────
     # CRUD Operations
     # ──────────────────────────────────────────────
 
-    def add_article(self, article: Dict[str, Any]) -> None:
+    def add_article(self, article: Dict[str, Any]) -> int:
         """Adds a single article to the database."""
-        self.add_articles([article])
+        return self.add_articles([article])
 
-    def add_articles(self, articles: List[Dict[str, Any]]) -> None:
-        """Batch insert articles in a single transaction for performance."""
+    def add_articles(self, articles: List[Dict[str, Any]]) -> int:
+        """Batch insert articles in a single transaction; returns how many were new."""
         if not articles:
-            return
+            return 0
         with self.get_connection() as conn:
             cursor = conn.cursor()
             try:
                 ph = self._ph_one()
+                if not self._use_postgres:
+                    # Take the write lock up front (under busy_timeout) rather than
+                    # upgrading mid-batch, where a concurrent writer means SQLITE_BUSY
+                    cursor.execute("BEGIN IMMEDIATE")
+                rows = []
+                for a in articles:
+                    comments = _coerce_count(a.get('comments', '0'))
+                    rows.append((
+                        a.get('title'), a.get('link'), _coerce_count(a.get('score', 0)),
+                        a.get('author', 'Unknown'), a.get('time', 'Unknown'),
+                        str(comments), comments, a.get('source', 'Unknown'),
+                        time.time(),
+                        a.get('excerpt', ''),
+                        a.get('image_url', '')
+                    ))
                 cursor.executemany(f'''
                     INSERT INTO articles
-                    (title, link, score, author, time_posted, comments, source, created_at,
-                     is_saved, is_read, sentiment, sentiment_score, category, read_time,
+                    (title, link, score, author, time_posted, comments, comments_count, source,
+                     created_at, is_saved, is_read, sentiment, sentiment_score, category, read_time,
                      metadata_processed_at, excerpt, image_url)
-                    VALUES ({ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph},
+                    VALUES ({ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph},
                             0, 0, 'neutral', 0.0, 'general', 0, NULL, {ph}, {ph})
                     ON CONFLICT (link) DO NOTHING
-                ''', [
-                    (
-                        a.get('title'), a.get('link'), a.get('score', 0),
-                        a.get('author', 'Unknown'), a.get('time', 'Unknown'),
-                        a.get('comments', '0'), a.get('source', 'Unknown'),
-                        time.time(),
-                        a.get('excerpt', ''),
-                        a.get('image_url', '')
-                    )
-                    for a in articles
-                ])
+                ''', rows)
+                inserted = max(cursor.rowcount, 0)
                 conn.commit()
-                logger.info(f"Batch inserted {len(articles)} articles (duplicates ignored).")
+                logger.info(f"Batch inserted {inserted} of {len(articles)} articles (duplicates ignored).")
+                return inserted
             except Exception as e:
+                conn.rollback()
                 logger.error(f"DB error during batch insert: {e}")
+                return 0
 
     def upsert_images(self, articles: List[Dict[str, Any]]) -> None:
         """Update image_url for articles that have it but the DB row doesn't."""
@@ -273,164 +453,274 @@ class Database:
     # Query Operations (with pagination)
     # ──────────────────────────────────────────────
 
+    def _articles_query(self, source_filter: str = 'all', keyword: str = '',
+                        saved_only: bool = False, unread_only: bool = False,
+                        category: str = '', sort_by: str = 'newest',
+                        columns: str = '*',
+                        after: Optional[Tuple[Any, ...]] = None) -> Tuple[str, List[Any]]:
+        """Builds the filtered, ordered article SELECT (without LIMIT) and its params.
+
+        `after` is a keyset cursor from keyset_cursor(); rows up to and including it are skipped.
+        """
+        ph = self._ph_one()
+
+        where, params = self._articles_where(source_filter, keyword, saved_only, unread_only, category)
+        query = f"SELECT {columns} FROM articles WHERE 1=1{where}"
+
+        sort_cols = self._sort_columns(sort_by)
+        if after is not None:
+            if len(after) != len(sort_cols) + 1:
+                raise ValueError("Cursor does not match sort order")
+            *values, last_id = after
+            cols = ', '.join(sort_cols)
+            phs = ', '.join([ph] * len(sort_cols))
+            ties = ' AND '.join(f"{c} = {ph}" for c in sort_cols)
+            # The redundant <= bound gives the planner an index range to seek into
+            query += f" AND ({cols}) <= ({phs}) AND (({cols}) < ({phs}) OR ({ties} AND id > {ph}))"
+            params.extend([*values, *values, *values, last_id])
+
+        query += f" ORDER BY {self._order_clause(sort_by)}"
+        return query, params
+
+    def _articles_where(self, source_filter: str = 'all', keyword: str = '',
+                        saved_only: bool = False, unread_only: bool = False,
+                        category: str = '') -> Tuple[str, List[Any]]:
+        """Builds the AND-ed filter clauses shared by the article queries and counts."""
+        ph = self._ph_one()
+        where = ""
+        params: List[Any] = []
+
+        if saved_only:
+            where += " AND is_saved = 1"
+
+        if unread_only:
+            where += " AND is_read = 0"
+
+        if source_filter and source_filter != 'all':
+            where += f" AND source = {ph}"
+            params.append(source_filter)
+
+        if keyword:
+            pattern = f"%{keyword}%"
+            if self._use_postgres:
+                where += f" AND title ILIKE {ph}"
+                params.append(pattern)
+            else:
+                # Trigrams need 3+ characters. The trigram index only narrows the rows
+                # (it folds case beyond ASCII); title LIKE still decides the match.
+                if self._title_trigram and len(keyword) >= 3:
+                    where += f" AND id IN (SELECT rowid FROM articles_title_trgm WHERE title LIKE {ph})"
+                    params.append(pattern)
+                where += f" AND title LIKE {ph}"
+                params.append(pattern)
+
+        if category and category != 'all':
+            where += f" AND category = {ph}"
+            params.append(category)
+
+        return where, params
+
+    def _sort_columns(self, sort_by: str) -> Tuple[str, ...]:
+        return self.SORT_COLUMNS.get((sort_by or 'newest').lower(), self.SORT_COLUMNS['newest'])
+
+    def _order_clause(self, sort_by: str, alias: str = '') -> str:
+        prefix = f"{alias}." if alias else ''
+        cols = ', '.join(f"{prefix}{c} DESC" for c in self._sort_columns(sort_by))
+        return f"{cols}, {prefix}id ASC"
+
+    def _late_lookup(self, page_query: str, sort_by: str, extra_columns: str = '') -> str:
+        """Joins full rows onto an id-only page query, so skipped rows are read from the index only."""
+        return (f"SELECT a.*, a.time_posted AS time{extra_columns} "
+                f"FROM articles a JOIN ({page_query}) k ON a.id = k.id "
+                f"ORDER BY {self._order_clause(sort_by, 'a')}")
+
+    def keyset_cursor(self, article: Dict[str, Any], sort_by: str = 'newest') -> Tuple[Any, ...]:
+        """Returns the cursor that seeks past `article` for the given sort order."""
+        return tuple(article[c] for c in self._sort_columns(sort_by)) + (article['id'],)
+
     def get_articles(self, limit: int = 30, offset: int = 0, source_filter: str = 'all',
                      keyword: str = '', saved_only: bool = False,
                      unread_only: bool = False, category: str = '',
-                     sort_by: str = 'newest') -> List[Dict[str, Any]]:
-        """Retrieves articles with optional filtering and pagination."""
+                     sort_by: str = 'newest',
+                     after: Optional[Tuple[Any, ...]] = None) -> List[Dict[str, Any]]:
+        """Retrieves articles with optional filtering and pagination.
+
+        Pass `after` (see keyset_cursor) to seek instead of OFFSET, so deep pages cost O(limit).
+        """
         with self.get_connection() as conn:
-            cursor = conn.cursor()
+            cursor = self._dict_cursor(conn)
             ph = self._ph_one()
 
-            query = "SELECT * FROM articles WHERE 1=1"
-            params: List[Any] = []
-
-            if saved_only:
-                query += " AND is_saved = 1"
+            query, params = self._articles_query(source_filter, keyword, saved_only,
+                                                 unread_only, category, sort_by,
+                                                 columns='id', after=after)
+            if after is not None:
+                query += f" LIMIT {ph}"
+                params.append(limit)
+            else:
+                query += f" LIMIT {ph} OFFSET {ph}"
+                params.extend([limit, offset])
 
-            if unread_only:
-                query += " AND is_read = 0"
+            cursor.execute(self._late_lookup(query, sort_by), params)
+            return cursor.fetchall()
 
-            if source_filter and source_filter != 'all':
-                query += f" AND source = {ph}"
-                params.append(source_filter)
+    def get_articles_page(self, limit: int = 30, offset: int = 0, source_filter: str = 'all',
+                          keyword: str = '', saved_only: bool = False,
+                          category: str = '', sort_by: str = 'newest') -> Tuple[List[Dict[str, Any]], int]:
+        """Returns one page of articles plus the total filtered count from a single query."""
+        with self.get_connection() as conn:
+            cursor = self._dict_cursor(conn)
+            ph = self._ph_one()
 
-            if keyword:
-                query += f" AND title ILIKE {ph}" if self._use_postgres else f" AND title LIKE {ph}"
-                params.append(f"%{keyword}%")
+            query, params = self._articles_query(source_filter, keyword, saved_only,
+                                                 category=category, sort_by=sort_by,
+                                                 columns="id, COUNT(*) OVER () AS total_count")
+            query += f" LIMIT {ph} OFFSET {ph}"
+            params.extend([limit, offset])
 
-            if category and category != 'all':
-                query += f" AND category = {ph}"
-                params.append(category)
+            cursor.execute(self._late_lookup(query, sort_by, extra_columns=', k.total_count'), params)
+            rows = cursor.fetchall()
 
-            order_by = "created_at DESC"
-            sort_key = (sort_by or 'newest').lower()
-            if sort_key == 'score':
-                order_by = f"{self._cast_int('score')} DESC, created_at DESC"
-            elif sort_key == 'comments':
-                if self._use_postgres:
-                    order_by = f"CASE WHEN {self._glob('comments', r'^\d+$')} THEN {self._cast_int('comments')} ELSE 0 END DESC, created_at DESC"
-                else:
-                    order_by = (
-                        f"CASE WHEN {self._glob('comments', '[0-9]*')} THEN {self._cast_int('comments')} "
-                        f"ELSE 0 END DESC, created_at DESC"
-                    )
+        if not rows:
+            # Past the last page the window has no rows to report the total on
+            total = self.get_total_count(source_filter=source_filter, keyword=keyword,
+                                         saved_only=saved_only, category=category) if offset else 0
+            return [], total
 
-            query += f" ORDER BY {order_by} LIMIT {ph} OFFSET {ph}"
-            params.extend([limit, offset])
+        total = rows[0]['total_count']
+        for row in rows:
+            del row['total_count']
+        return rows, total
 
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
+    def _iter_rows(self, query: str, params: List[Any]) -> Iterator[Dict[str, Any]]:
+        """Yields rows in fetchmany() batches instead of one fetchall() list."""
+        with self.get_connection() as conn:
+            if self._use_postgres:
+                # A named cursor keeps the result set on the server; psycopg2's default
+                # cursor would pull every row into client memory on execute()
+                cursor = conn.cursor(name='sniffer_stream')
+            else:
+                cursor = self._dict_cursor(conn)
+            cursor.arraysize = self.STREAM_BATCH_SIZE
+            try:
+                cursor.execute(query, params)
+                while batch := cursor.fetchmany():
+                    yield from batch
+            finally:
+                cursor.close()
 
-            results = []
-            for row in rows:
-                d = dict(row)
-                d['time'] = d['time_posted']
-                results.append(d)
+    def iter_articles(self, limit: int = 500, source_filter: str = 'all',
+                      keyword: str = '', category: str = '',
+                      sort_by: str = 'newest') -> Iterator[Dict[str, Any]]:
+        """Yields articles one at a time straight from the cursor (for streaming exports)."""
+        ph = self._ph_one()
+        query, params = self._articles_query(source_filter, keyword, category=category,
+                                             sort_by=sort_by, columns="*, time_posted AS time")
+        query += f" LIMIT {ph}"
+        params.append(limit)
 
-            return results
+        yield from self._iter_rows(query, params)
 
     def get_total_count(self, source_filter: str = 'all', keyword: str = '',
                         saved_only: bool = False, category: str = '') -> int:
         """Returns total article count for pagination calculation."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            ph = self._ph_one()
-            query = "SELECT COUNT(*) FROM articles WHERE 1=1"
-            params: List[Any] = []
-
-            if saved_only:
-                query += " AND is_saved = 1"
-            if source_filter and source_filter != 'all':
-                query += f" AND source = {ph}"
-                params.append(source_filter)
-            if keyword:
-                query += f" AND title ILIKE {ph}" if self._use_postgres else f" AND title LIKE {ph}"
-                params.append(f"%{keyword}%")
-            if category and category != 'all':
-                query += f" AND category = {ph}"
-                params.append(category)
-
-            cursor.execute(query, params)
+            where, params = self._articles_where(source_filter, keyword, saved_only, category=category)
+            cursor.execute(f"SELECT COUNT(*) FROM articles WHERE 1=1{where}", params)
             return cursor.fetchone()[0]
 
     # ──────────────────────────────────────────────
     # Full-Text Search
     # ──────────────────────────────────────────────
 
-    def search_articles(self, query: str, limit: int = 50) -> List[Dict[str, Any]]:
+    def search_articles(self, query: str, limit: int = 50, source_filter: str = 'all',
+                        category: str = '') -> List[Dict[str, Any]]:
         """Full-text search using FTS5 (SQLite) or ILIKE (PostgreSQL)."""
         with self.get_connection() as conn:
-            cursor = conn.cursor()
+            cursor = self._dict_cursor(conn)
             ph = self._ph_one()
+
+            conditions: List[Tuple[str, Any]] = []
+            if source_filter and source_filter != 'all':
+                conditions.append(('source', source_filter))
+            if category and category != 'all':
+                conditions.append(('category', category))
+            filter_params = [value for _, value in conditions]
+
             if self._use_postgres:
                 # PostgreSQL: use ILIKE across multiple columns
                 cursor.execute(f'''
-                    SELECT * FROM articles
-                    WHERE title ILIKE {ph} OR excerpt ILIKE {ph} OR author ILIKE {ph} OR source ILIKE {ph}
+                    SELECT *, time_posted AS time FROM articles
+                    WHERE (title ILIKE {ph} OR excerpt ILIKE {ph} OR author ILIKE {ph} OR source ILIKE {ph})
+                    {''.join(f"AND {col} = {ph} " for col, _ in conditions)}
                     ORDER BY created_at DESC
                     LIMIT {ph}
-                ''', (f"%{query}%", f"%{query}%", f"%{query}%", f"%{query}%", limit))
+                ''', (f"%{query}%", f"%{query}%", f"%{query}%", f"%{query}%", *filter_params, limit))
             else:
+                # Rank inside the FTS index first, then join back only the top candidates;
+                # filters apply to that candidate set, so over-fetch when there are any
+                candidates = limit * 10 if conditions else limit
                 try:
-                    cursor.execute('''
-                        SELECT a.* FROM articles a
-                        JOIN articles_fts fts ON a.id = fts.rowid
-                        WHERE articles_fts MATCH ?
-                        ORDER BY rank
+                    cursor.execute(f'''
+                        WITH m AS (
+                            SELECT rowid, rank FROM articles_fts
+                            WHERE articles_fts MATCH ?
+                            ORDER BY rank
+                            LIMIT ?
+                        )
+                        SELECT a.*, a.time_posted AS time FROM m JOIN articles a ON a.id = m.rowid
+                        WHERE 1=1 {''.join(f"AND a.{col} = ? " for col, _ in conditions)}
+                        ORDER BY m.rank
                         LIMIT ?
-                    ''', (query, limit))
+                    ''', (query, candidates, *filter_params, limit))
                 except sqlite3.OperationalError as e:
                     logger.warning(f"FTS search error: {e}")
-                    return self.get_articles(limit=limit, keyword=query, sort_by='newest')
+                    return self.get_articles(limit=limit, source_filter=source_filter, keyword=query,
+                                             category=category, sort_by='newest')
 
-            rows = cursor.fetchall()
-            results = []
-            for row in rows:
-                d = dict(row)
-                d['time'] = d['time_posted']
-                results.append(d)
-            return results
+            return cursor.fetchall()
+
+    def optimize_fts(self) -> bool:
+        """Merges the FTS5 index segments into one b-tree (SQLite only); returns True if run."""
+        if self._use_postgres:
+            return False
+        with self.get_connection() as conn:
+            try:
+                conn.execute("INSERT INTO articles_fts(articles_fts) VALUES ('integrity-check')")
+                conn.execute("INSERT INTO articles_fts(articles_fts) VALUES ('optimize')")
+                conn.commit()
+            except sqlite3.DatabaseError as e:
+                conn.rollback()
+                logger.error(f"FTS optimize failed: {e}")
+                return False
+            return True
 
     # ──────────────────────────────────────────────
     # Bookmarks & Reading List
     # ──────────────────────────────────────────────
 
-    def toggle_bookmark(self, article_id: int) -> Optional[bool]:
-        """Toggles the bookmark status of an article."""
+    def _toggle_flag(self, column: str, article_id: int) -> Optional[bool]:
+        """Flips a 0/1 column in a single UPDATE ... RETURNING; None if the article is missing."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             ph = self._ph_one()
-            cursor.execute(f"SELECT is_saved FROM articles WHERE id = {ph}", (article_id,))
+            cursor.execute(
+                f"UPDATE articles SET {column} = CASE WHEN {column} = 1 THEN 0 ELSE 1 END "
+                f"WHERE id = {ph} RETURNING {column}",
+                (article_id,)
+            )
             result = cursor.fetchone()
-
-            if not result:
-                return None
-
-            current_status = result['is_saved']
-            new_status = not current_status
-            cursor.execute(f"UPDATE articles SET is_saved = {ph} WHERE id = {ph}", (int(new_status), article_id))
             conn.commit()
+            return bool(result[0]) if result else None
 
-            return bool(new_status)
+    def toggle_bookmark(self, article_id: int) -> Optional[bool]:
+        """Toggles the bookmark status of an article."""
+        return self._toggle_flag('is_saved', article_id)
 
     def toggle_read(self, article_id: int) -> Optional[bool]:
         """Toggles the read status of an article."""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            ph = self._ph_one()
-            cursor.execute(f"SELECT is_read FROM articles WHERE id = {ph}", (article_id,))
-            result = cursor.fetchone()
-
-            if not result:
-                return None
-
-            current_status = result['is_read']
-            new_status = not current_status
-            cursor.execute(f"UPDATE articles SET is_read = {ph} WHERE id = {ph}", (int(new_status), article_id))
-            conn.commit()
-
-            return bool(new_status)
+        return self._toggle_flag('is_read', article_id)
 
     # ──────────────────────────────────────────────
     # Sentiment & Category Updates
@@ -468,6 +758,27 @@ class Database:
                 cursor.execute(f"UPDATE articles SET {', '.join(updates)} WHERE id = {ph}", params)
                 conn.commit()
 
+    def update_article_metadata_bulk(self, rows: List[Tuple[str, float, str, int, float, int]]) -> None:
+        """Batch-updates article metadata in a single transaction.
+
+        Each row is (sentiment, sentiment_score, category, read_time,
+        metadata_processed_at, article_id).
+        """
+        if not rows:
+            return
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            ph = self._ph_one()
+            query = (f"UPDATE articles SET sentiment = {ph}, sentiment_score = {ph}, category = {ph}, "
+                     f"read_time = {ph}, metadata_processed_at = {ph} WHERE id = {ph}")
+            try:
+                for start in range(0, len(rows), self.METADATA_BATCH_SIZE):
+                    cursor.executemany(query, rows[start:start + self.METADATA_BATCH_SIZE])
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"DB error during metadata batch update: {e}")
+
     def get_unprocessed_articles(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Gets articles that haven't been processed for sentiment/category yet."""
         with self.get_connection() as conn:
@@ -481,6 +792,62 @@ class Database:
             rows = cursor.fetchall()
             return [dict(row) for row in rows]
 
+    # ──────────────────────────────────────────────
+    # Summary Cache
+    # ──────────────────────────────────────────────
+
+    def get_summary(self, url_hash: str, max_age: float) -> Optional[Dict[str, Any]]:
+        """Returns a cached summary if one was stored within max_age seconds."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            ph = self._ph_one()
+            cursor.execute(
+                f"SELECT payload FROM summaries WHERE url_hash = {ph} AND created_at >= {ph}",
+                (url_hash, time.time() - max_age)
+            )
+            row = cursor.fetchone()
+            return json.loads(row[0]) if row else None
+
+    def save_summary(self, url_hash: str, payload: Dict[str, Any], max_age: float) -> None:
+        """Stores a summary and drops entries older than max_age seconds."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            ph = self._ph_one()
+            now = time.time()
+            cursor.execute(f'''
+                INSERT INTO summaries (url_hash, payload, created_at) VALUES ({ph}, {ph}, {ph})
+                ON CONFLICT (url_hash) DO UPDATE SET payload = excluded.payload, created_at = excluded.created_at
+            ''', (url_hash, json.dumps(payload), now))
+            cursor.execute(f"DELETE FROM summaries WHERE created_at < {ph}", (now - max_age,))
+            conn.commit()
+
+    # ──────────────────────────────────────────────
+    # Source Health
+    # ──────────────────────────────────────────────
+
+    def save_source_health(self, health: List[Dict[str, Any]]) -> None:
+        """Replaces the stored health entry of each source in one transaction."""
+        if not health:
+            return
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            ph = self._ph_one()
+            now = time.time()
+            cursor.executemany(f'''
+                INSERT INTO source_health (source, position, payload, updated_at)
+                VALUES ({ph}, {ph}, {ph}, {ph})
+                ON CONFLICT (source) DO UPDATE SET position = excluded.position,
+                    payload = excluded.payload, updated_at = excluded.updated_at
+            ''', [(h['source'], i, json.dumps(h), now) for i, h in enumerate(health)])
+            conn.commit()
+
+    def get_source_health(self) -> List[Dict[str, Any]]:
+        """Returns the stored health entries in the order they were saved."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT payload FROM source_health ORDER BY position")
+            return [json.loads(row[0]) for row in cursor.fetchall()]
+
     # ──────────────────────────────────────────────
     # Statistics & Analytics
     # ──────────────────────────────────────────────
@@ -491,37 +858,45 @@ class Database:
             cursor.execute("SELECT COUNT(*) FROM articles")
             return cursor.fetchone()[0]
 
+    def get_data_version(self) -> Tuple[Any, ...]:
+        """Cheap stamp that changes whenever articles are added, removed, or re-tagged."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*), MAX(created_at), MAX(metadata_processed_at) FROM articles")
+            return tuple(cursor.fetchone())
+
     def get_stats(self) -> Dict[str, Any]:
         """Returns statistics about articles in the database."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
 
-            cursor.execute("SELECT COUNT(*) FROM articles")
-            total = cursor.fetchone()[0]
-
+            # All scalar counts in one scan
             twenty_four_hours_ago = time.time() - (24 * 60 * 60)
             ph = self._ph_one()
-            cursor.execute(f"SELECT COUNT(*) FROM articles WHERE created_at >= {ph}", (twenty_four_hours_ago,))
-            today = cursor.fetchone()[0]
-
-            cursor.execute("SELECT COUNT(*) FROM articles WHERE is_saved = 1")
-            saved = cursor.fetchone()[0]
-
-            cursor.execute("SELECT COUNT(*) FROM articles WHERE is_read = 1")
-            read_count = cursor.fetchone()[0]
-
-            cursor.execute("SELECT source, COUNT(*) as count FROM articles GROUP BY source")
-            by_source_rows = cursor.fetchall()
-            by_source = {row['source']: row['count'] for row in by_source_rows}
-
-            cursor.execute("SELECT category, COUNT(*) as count FROM articles GROUP BY category ORDER BY count DESC")
-            by_category_rows = cursor.fetchall()
-            by_category = {row['category']: row['count'] for row in by_category_rows}
+            cursor.execute(f'''
+                SELECT COUNT(*) AS total,
+                       COALESCE(SUM(CASE WHEN created_at >= {ph} THEN 1 ELSE 0 END), 0) AS today,
+                       COALESCE(SUM(CASE WHEN is_saved = 1 THEN 1 ELSE 0 END), 0) AS saved,
+                       COALESCE(SUM(CASE WHEN is_read = 1 THEN 1 ELSE 0 END), 0) AS read_count
+                FROM articles
+            ''', (twenty_four_hours_ago,))
+            total, today, saved, read_count = cursor.fetchone()
+
+            # Source, category and sentiment breakdowns through one cursor
+            cursor.execute('''
+                SELECT 'source' AS kind, source AS value, COUNT(*) AS count FROM articles GROUP BY source
+                UNION ALL
+                SELECT 'category', category, COUNT(*) FROM articles GROUP BY category
+                UNION ALL
+                SELECT 'sentiment', sentiment, COUNT(*) FROM articles GROUP BY sentiment
+            ''')
+            breakdowns: Dict[str, Dict[Any, int]] = {'source': {}, 'category': {}, 'sentiment': {}}
+            for kind, value, count in cursor.fetchall():
+                breakdowns[kind][value] = count
 
-            # Sentiment breakdown
-            cursor.execute("SELECT sentiment, COUNT(*) as count FROM articles GROUP BY sentiment")
-            by_sentiment_rows = cursor.fetchall()
-            by_sentiment = {row['sentiment']: row['count'] for row in by_sentiment_rows}
+            by_source = breakdowns['source']
+            by_category = dict(sorted(breakdowns['category'].items(), key=lambda item: item[1], reverse=True))
+            by_sentiment = breakdowns['sentiment']
 
             return {
                 'total': total,
@@ -566,83 +941,65 @@ class Database:
     def get_personalized_feed(self, limit: int = 30) -> List[Dict[str, Any]]:
         """Returns articles boosted by user preferences (based on bookmarked sources/categories)."""
         with self.get_connection() as conn:
-            cursor = conn.cursor()
+            cursor = self._dict_cursor(conn)
             ph = self._ph_one()
 
-            # Find user's preferred sources and categories from bookmarks
+            # Preferences (top 3 bookmarked sources/categories) and scoring in one static
+            # statement; with no bookmarks every score is 0 and this is just newest-first
             cursor.execute(f'''
-                SELECT source, COUNT(*) as cnt FROM articles
-                WHERE is_saved = 1 GROUP BY source ORDER BY cnt DESC LIMIT 3
-            ''')
-            preferred_sources = [row['source'] for row in cursor.fetchall()]
-
-            cursor.execute(f'''
-                SELECT category, COUNT(*) as cnt FROM articles
-                WHERE is_saved = 1 GROUP BY category ORDER BY cnt DESC LIMIT 3
-            ''')
-            preferred_categories = [row['category'] for row in cursor.fetchall()]
-
-            if not preferred_sources and not preferred_categories:
-                # No preferences yet, return recent articles
-                return self.get_articles(limit=limit)
-
-            # Build a scoring query that boosts preferred content
-            placeholders_src = self._ph(len(preferred_sources))
-            placeholders_cat = self._ph(len(preferred_categories))
-
-            query = f'''
-                SELECT *,
-                    (CASE WHEN source IN ({placeholders_src}) THEN 2 ELSE 0 END +
-                     CASE WHEN category IN ({placeholders_cat}) THEN 1 ELSE 0 END) as relevance_score
+                WITH saved AS (
+                    SELECT source, category FROM articles WHERE is_saved = 1
+                ),
+                preferred_sources AS (
+                    SELECT source FROM saved GROUP BY source ORDER BY COUNT(*) DESC LIMIT 3
+                ),
+                preferred_categories AS (
+                    SELECT category FROM saved GROUP BY category ORDER BY COUNT(*) DESC LIMIT 3
+                )
+                SELECT *, time_posted AS time,
+                    (CASE WHEN source IN (SELECT source FROM preferred_sources) THEN 2 ELSE 0 END +
+                     CASE WHEN category IN (SELECT category FROM preferred_categories) THEN 1 ELSE 0 END) as relevance_score
                 FROM articles
-                ORDER BY relevance_score DESC, created_at DESC
+                ORDER BY relevance_score DESC, created_at DESC, id ASC
                 LIMIT {ph}
-            '''
-            params = preferred_sources + preferred_categories + [limit]
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
-
-            results = []
-            for row in rows:
-                d = dict(row)
-                d['time'] = d['time_posted']
-                results.append(d)
-            return results
+            ''', (limit,))
+            return cursor.fetchall()
 
     # ──────────────────────────────────────────────
     # Export
     # ──────────────────────────────────────────────
 
-    def export_bookmarks_json(self) -> str:
-        """Exports bookmarked articles as JSON string."""
-        articles = self.get_articles(limit=1000, saved_only=True)
-        export_data = []
-        for a in articles:
-            export_data.append({
-                'title': a.get('title'),
-                'link': a.get('link'),
-                'source': a.get('source'),
-                'author': a.get('author'),
-                'score': a.get('score'),
-                'category': a.get('category'),
-                'sentiment': a.get('sentiment'),
-                'saved_at': a.get('created_at')
-            })
-        return json.dumps(export_data, indent=2)
-
-    def export_bookmarks_markdown(self) -> str:
-        """Exports bookmarked articles as Markdown string."""
-        articles = self.get_articles(limit=1000, saved_only=True)
-        lines = ["# Saved Articles\n"]
-        # Group by source
-        by_source: Dict[str, list] = {}
-        for a in articles:
-            src = a.get('source', 'Other')
-            by_source.setdefault(src, []).append(a)
-
-        for source, arts in by_source.items():
-            lines.append(f"\n## {source}\n")
-            for a in arts:
-                lines.append(f"- [{a.get('title')}]({a.get('link')})")
-
-        return '\n'.join(lines)
+    def export_bookmarks_json(self) -> Iterator[str]:
+        """Streams bookmarked articles as a JSON array, one article at a time."""
+        ph = self._ph_one()
+        rows = self._iter_rows(f'''
+            SELECT title, link, source, author, score, category, sentiment, created_at AS saved_at
+            FROM articles WHERE is_saved = 1
+            ORDER BY created_at DESC, id ASC
+            LIMIT {ph}
+        ''', [self.EXPORT_LIMIT])
+
+        # Same layout as json.dumps(list, indent=2), without holding the list
+        yield '['
+        first = True
+        for row in rows:
+            yield ('\n' if first else ',\n') + textwrap.indent(json.dumps(row, indent=2), '  ')
+            first = False
+        yield ']' if first else '\n]'
+
+    def export_bookmarks_markdown(self) -> Iterator[str]:
+        """Streams bookmarked articles as Markdown, grouped by source."""
+        ph = self._ph_one()
+        rows = self._iter_rows(f'''
+            SELECT title, link, source FROM articles WHERE is_saved = 1
+            ORDER BY source, created_at DESC, id ASC
+            LIMIT {ph}
+        ''', [self.EXPORT_LIMIT])
+
+        yield "# Saved Articles\n"
+        current_source = None
+        for row in rows:
+            if row['source'] != current_source:
+                current_source = row['source']
+                yield f"\n\n## {current_source or 'Other'}\n"
+            yield f"\n- [{row['title']}]({row['link']})"
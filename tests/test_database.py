@@ -0,0 +1,80 @@
+"""Tests for database.py keyword filtering against the plain LIKE baseline."""
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from database import Database
+
+TITLES = [
+    "C++ 26 released",
+    "Catastrophic crash in prod",
+    "Cloud computing costs",
+    "Why Rust beats C",
+    "C# 13 pattern matching",
+    ".NET 9 performance",
+    "Netflix open-sources a tool",
+    "Python 3.13 is out",
+    "Jython revived",
+    "CPython internals",
+    "Rust news roundup",
+    "News about Rust",
+]
+
+
+class KeywordFilterTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        with mock.patch.dict(os.environ, {'DATABASE_URL': ''}):
+            self.db = Database(os.path.join(self.tmpdir, 'test.db'))
+        self.db.add_articles([
+            {'title': title, 'link': f'https://example.com/{i}', 'source': 'Test'}
+            for i, title in enumerate(TITLES)
+        ])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _titles(self, keyword):
+        return sorted(a['title'] for a in self.db.get_articles(limit=100, keyword=keyword))
+
+    def _like_baseline(self, keyword):
+        with self.db.get_connection() as conn:
+            rows = conn.execute("SELECT title FROM articles WHERE title LIKE ?",
+                                (f"%{keyword}%",)).fetchall()
+        return sorted(row[0] for row in rows)
+
+    def assertMatchesLike(self, keyword, expected):
+        self.assertEqual(self._titles(keyword), sorted(expected))
+        self.assertEqual(self._titles(keyword), self._like_baseline(keyword))
+
+    def test_punctuation_is_not_dropped(self):
+        self.assertMatchesLike("C++", ["C++ 26 released"])
+        self.assertMatchesLike("C#", ["C# 13 pattern matching"])
+        self.assertMatchesLike(".NET", [".NET 9 performance"])
+
+    def test_mid_word_keyword(self):
+        self.assertMatchesLike("ython", ["Python 3.13 is out", "Jython revived", "CPython internals"])
+
+    def test_multi_word_keyword_keeps_order(self):
+        self.assertMatchesLike("Rust news", ["Rust news roundup"])
+
+    def test_case_insensitive(self):
+        self.assertMatchesLike("python", ["Python 3.13 is out", "CPython internals"])
+
+    @unittest.skipIf(sqlite3.sqlite_version_info < (3, 34), "FTS5 trigram needs SQLite 3.34+")
+    def test_trigram_index_is_used(self):
+        self.assertTrue(self.db._title_trigram)
+        query, params = self.db._articles_query(keyword="ython", columns='id')
+        with self.db.get_connection() as conn:
+            plan = ' '.join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params))
+        self.assertIn('articles_title_trgm', plan)
+
+    def test_count_matches_rows(self):
+        self.assertEqual(self.db.get_total_count(keyword="ython"), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+"""
+Summarizer Module — Sniffer
+Extracts title, summary, and lead image from fetched HTML with trafilatura.
+Imports nothing from the app so it stays cheap to load in worker processes.
+"""
+import json
+import os
+from typing import Dict
+
+SUMMARY_MAX_CHARS = 500
+
+
+def load_extractor(pid_queue=None) -> None:
+    """Pool initializer: imports trafilatura and its lxml/charset deps once per worker.
+
+    Puts this worker's PID on pid_queue so the parent can stop a stuck worker.
+    """
+    if pid_queue is not None:
+        pid_queue.put(os.getpid())
+    import trafilatura  # noqa: F401
+
+
+def extract_summary(downloaded: bytes) -> Dict[str, str]:
+    """Extracts a short summary from raw page bytes (lxml-based, no ML deps)."""
+    import trafilatura
+
+    # Extract main content
+    result = trafilatura.extract(
+        downloaded,
+        include_comments=False,
+        include_tables=False,
+        include_images=False,
+        output_format='json',
+        with_metadata=True
+    )
+
+    if result:
+        data = json.loads(result)
+        title = data.get('title') or ''
+        summary = (data.get('excerpt') or data.get('raw_text') or '')[:SUMMARY_MAX_CHARS]
+        image = data.get('image') or ''
+    else:
+        # Fallback: extract text only
+        text = trafilatura.extract(downloaded, include_comments=False, include_tables=False)
+        title = ''
+        summary = text[:SUMMARY_MAX_CHARS] if text else 'Could not extract content'
+        image = ''
+
+    return {
+        'title': title,
+        'summary': summary,
+        'top_image': image
+    }
@@ -7,21 +7,82 @@ import re
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+import soupsieve
 import feedparser
 import time
 import logging
+import threading
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 import aiohttp
 import asyncio
 
 from utils.credibility import is_credible, score_article
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_loads = json.loads
+
+# lxml's C parser is several times faster than the pure-Python html.parser
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
 logger = logging.getLogger(__name__)
 
 EXCERPT_MAX_LEN = 280
+FEED_TIMEOUT = 10  # seconds per RSS request
+
+_IMG_SRC_RE = re.compile(r'<img[^>]+src=[\"\']([^\"\']+)', re.IGNORECASE)
+_TAG_RE = re.compile(r'<[^>]+>')
+# hnrss boilerplate: Article URL: ..., Comments URL: ..., Points: ..., # Comments: ...
+_HN_META_RE = re.compile(r'Article URL:\s*https?://\S+|Comments URL:\s*https?://\S+|Points:\s*\d+|#\s*Comments:\s*\d+')
+_WHITESPACE_RE = re.compile(r'\s+')
+_HN_POINTS_RE = re.compile(r'Points:\s*(\d+)')
+_HN_COMMENTS_RE = re.compile(r'Comments:\s*(\d+)')
+
+_HN_ROWS = SoupStrainer('tr')
+# HN row selectors, compiled once instead of per row (soupsieve is bs4's CSS engine)
+_HN_TITLE_SEL = soupsieve.compile('span.titleline a')
+_HN_SUBTEXT_SEL = soupsieve.compile('td.subtext')
+_HN_SCORE_SEL = soupsieve.compile('span.score')
+_HN_USER_SEL = soupsieve.compile('a.hnuser')
+_HN_AGE_SEL = soupsieve.compile('span.age')
+# The age link also points at item?id=, so skip it (job posts have no comments link)
+_HN_COMMENTS_SEL = soupsieve.compile('a[href^="item?id="]:not(.age a)')
+
+SCRAPER_HEADERS: dict[str, str] = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+}
+SESSION_POOL_SIZE = 16  # per-host keep-alive sockets; covers the HN page workers and overlapping scrapes
+
+
+def _build_session() -> requests.Session:
+    """Requests session with automatic retries on transient failures."""
+    session = requests.Session()
+    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503])
+    adapter = HTTPAdapter(pool_connections=SESSION_POOL_SIZE, pool_maxsize=SESSION_POOL_SIZE,
+                          max_retries=retries)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update(SCRAPER_HEADERS)
+    return session
+
+
+_SESSION = _build_session()
+
+# Last parsed feed per URL with its validators, for conditional GETs: (etag, last_modified, feed).
+# Module-level because each NewsAggregator builds fresh scrapers.
+_feed_cache: dict[str, tuple[str, str, feedparser.FeedParserDict]] = {}
 
 
 def _extract_feed_image(entry) -> str:
@@ -36,27 +97,55 @@ def _extract_feed_image(entry) -> str:
         value = getattr(entry, field, '') or ''
         if isinstance(value, list):
             value = ' '.join(str(part.get('value', '')) for part in value)
-        match = re.search(r'<img[^>]+src=[\"\']([^\"\']+)', str(value), re.IGNORECASE)
+        match = _IMG_SRC_RE.search(str(value))
         if match and match.group(1).startswith(('https://', 'http://')):
             return match.group(1)
     return ''
 
+# Query parameters that only track the referrer and never change the page
+_TRACKING_PARAMS = frozenset({'ref', 'ref_src', 'fbclid', 'gclid', 'cmpid', 'guccounter'})
+
+
+def _canonical_url(url: str) -> str:
+    """Normalize a link for duplicate detection: no fragment, tracking params, or trailing slash."""
+    parts = urlsplit(url.strip())
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if k.lower() not in _TRACKING_PARAMS and not k.lower().startswith('utm_')]
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'),
+                       urlencode(query), ''))
+
+
+def _dedupe_by_url(articles: list[dict]) -> list[dict]:
+    """Keeps one article per canonical link (the highest-scored), in first-seen order."""
+    best: dict[str, dict] = {}
+    unlinked = []
+    for article in articles:
+        link = article.get('link')
+        if not link:
+            unlinked.append(article)
+            continue
+        key = _canonical_url(link)
+        kept = best.get(key)
+        if kept is None:
+            best[key] = article
+        elif (article.get('score') or 0) > (kept.get('score') or 0):
+            best[key] = article  # replacing a value keeps the key's original position
+    return list(best.values()) + unlinked
+
+
 def _clean_excerpt(text: str) -> str:
     """Strip HTML tags, normalize whitespace, truncate to EXCERPT_MAX_LEN."""
     if not text:
         return ""
     # Remove HTML tags
-    text = re.sub(r'<[^>]+>', '', text)
+    text = _TAG_RE.sub('', text)
     # Decode common HTML entities
     text = text.replace('&', '&').replace('<', '<').replace('>', '>')
     text = text.replace("&#34;", "&#34;").replace("&#39;", "&#39;").replace("&nbsp;", " ")
-    # Strip HN raw URL patterns (Article URL: ..., Comments URL: ..., Points: ..., # Comments: ...)
-    text = re.sub(r'Article URL:\s*https?://\S+', '', text)
-    text = re.sub(r'Comments URL:\s*https?://\S+', '', text)
-    text = re.sub(r'Points:\s*\d+', '', text)
-    text = re.sub(r'#\s*Comments:\s*\d+', '', text)
+    # Strip HN raw URL patterns in one pass
+    text = _HN_META_RE.sub('', text)
     # Normalize whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _WHITESPACE_RE.sub(' ', text).strip()
 # Truncate at word boundary
     if len(text) > EXCERPT_MAX_LEN:
         text = text[:EXCERPT_MAX_LEN].rsplit(' ', 1)[0] + '…'
@@ -70,7 +159,7 @@ async def _fetch_article_image_async(session: aiohttp.ClientSession, url: str) -
             if response.status != 200:
                 return ''
             html = await response.text()
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = BeautifulSoup(html, HTML_PARSER)
             meta_og_image = soup.find('meta', property='og:image')
             if meta_og_image and meta_og_image.get('content'):
                 return str(meta_og_image['content'])
@@ -79,30 +168,118 @@ async def _fetch_article_image_async(session: aiohttp.ClientSession, url: str) -
         return ''
 
 
+# Generation of the scrape the current thread is running for; see BaseScraper._is_current
+_scrape_run = threading.local()
+
+
 class BaseScraper(ABC):
     """Abstract base class for all news scrapers."""
 
     def __init__(self) -> None:
-        self.headers: dict[str, str] = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        }
-        # Requests session with automatic retries on transient failures
-        self.session = requests.Session()
-        retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503])
-        self.session.mount('https://', HTTPAdapter(max_retries=retries))
-        self.session.mount('http://', HTTPAdapter(max_retries=retries))
-        self.session.headers.update(self.headers)
+        self.headers: dict[str, str] = SCRAPER_HEADERS
+        # Process-wide session, so keep-alive connections outlive each aggregator's scrapers
+        self.session = _SESSION
 
         # Health tracking
         self.last_scrape_time: float = 0
         self.last_status: str = "idle"  # idle, ok, error
         self.last_error: str = ""
         self.scrape_duration: float = 0
+        # Bumped when a run is abandoned, so its thread stops reporting health
+        self.generation: int = 0
 
     @abstractmethod
     def scrape(self, num_pages: int = 1) -> list[dict]:
         pass
 
+    def abandon_run(self) -> None:
+        """Invalidates the running scrape; a thread still inside it can no longer report."""
+        self.generation += 1
+
+    def _is_current(self) -> bool:
+        """True unless this thread runs a scrape the aggregator has since abandoned."""
+        return getattr(_scrape_run, 'generation', self.generation) == self.generation
+
+    def _set_status(self, status: str, error: str = None) -> None:
+        if not self._is_current():
+            return
+        self.last_status = status
+        if error is not None:
+            self.last_error = error
+
+    @contextmanager
+    def _track(self, tag: str, kind: str):
+        """Times one scrape and records its health; yields the list the scrape fills.
+
+        Errors are logged and recorded rather than raised, so one source never sinks the batch.
+        """
+        articles: list[dict] = []
+        start = time.perf_counter()
+        logger.info(f"[{tag}] Starting {kind} scrape...")
+        try:
+            yield articles
+        except Exception as e:
+            self._set_status("error", str(e))
+            logger.warning(f"[{tag}] Error: {e}")
+        finally:
+            if self._is_current():
+                self.scrape_duration = time.perf_counter() - start
+                self.last_scrape_time = time.time()
+            logger.info(f"[{tag}] Done. {len(articles)} articles in {self.scrape_duration:.1f}s")
+
+    def _fetch_feed(self, url: str):
+        """Downloads a feed over the pooled, retrying session and parses the bytes.
+
+        Sends the previous ETag/Last-Modified; on 304 the cached parse is reused.
+        """
+        cached = _feed_cache.get(url)
+        request_headers = {}
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                request_headers['If-None-Match'] = etag
+            if last_modified:
+                request_headers['If-Modified-Since'] = last_modified
+
+        response = self.session.get(url, headers=request_headers, timeout=FEED_TIMEOUT)
+        if response.status_code == 304 and cached:
+            return cached[2]
+        response.raise_for_status()
+        # Headers let feedparser take the charset from Content-Type instead of sniffing;
+        # it looks them up in a plain dict by lowercase name
+        headers = {key.lower(): value for key, value in response.headers.items()}
+        feed = feedparser.parse(response.content, response_headers=headers)
+
+        etag = response.headers.get('ETag', '')
+        last_modified = response.headers.get('Last-Modified', '')
+        if etag or last_modified:
+            _feed_cache[url] = (etag, last_modified, feed)
+        else:
+            _feed_cache.pop(url, None)
+        return feed
+
+    def _parse_rss_entries(self, feed, limit: int, source: str, default_author: str) -> list[dict]:
+        """Builds article dicts from a publisher feed (no score or comment counts)."""
+        articles = []
+        for entry in feed.entries[:limit]:
+            # FeedParserDict.get is one dict lookup; hasattr goes through __getattr__ and its exception
+            title = entry.get('title')
+            link = entry.get('link')
+            if not title or not link:
+                continue
+            articles.append({
+                'title': title,
+                'link': link,
+                'score': 0,
+                'author': entry.get('author', default_author),
+                'time': entry.get('published', 'Recent'),
+                'comments': '0',
+                'source': source,
+                'excerpt': _clean_excerpt(entry.get('summary') or entry.get('description', '')),
+                'image_url': _extract_feed_image(entry)
+            })
+        return articles
+
     def get_health(self) -> dict:
         return {
             'source': self.__class__.__name__.replace('Scraper', ''),
@@ -116,6 +293,8 @@ class BaseScraper(ABC):
 class HackerNewsScraper(BaseScraper):
     """Scraper for Hacker News using RSS feed (hnrss.org) for speed."""
 
+    HTML_PAGE_WORKERS = 4  # concurrent page fetches for the HTML fallback
+
     def __init__(self) -> None:
         super().__init__()
         # hnrss.org provides a fast, reliable RSS feed for HN
@@ -123,106 +302,87 @@ class HackerNewsScraper(BaseScraper):
         self.fallback_url: str = "https://news.ycombinator.com/news"
 
     def scrape(self, num_pages: int = 1) -> list[dict]:
-        start = time.time()
-        articles = []
-        logger.info("[HN] Starting RSS scrape...")
-        try:
-            # Try RSS first (much faster)
-            feed = feedparser.parse(self.feed_url)
-            if feed.entries:
-                for entry in feed.entries:
-                    # Extract comments count from the description if available
-                    comments = "0"
-                    if hasattr(entry, 'comments') and entry.comments:
-                        # comments URL contains item ID
-                        pass
-
-                    score = 0
-                    # hnrss includes score in description
-                    if hasattr(entry, 'description'):
-                        desc = entry.description or ""
-                        if 'Points:' in desc:
-                            try:
-                                score = int(desc.split('Points:')[1].split('<')[0].strip())
-                            except (ValueError, IndexError):
-                                pass
-                        if 'Comments:' in desc:
-                            try:
-                                comments = desc.split('Comments:')[1].split('<')[0].strip()
-                            except (ValueError, IndexError):
-                                comments = "0"
-
-                    time_posted = "Recent"
-                    if hasattr(entry, 'published'):
-                        time_posted = entry.published
-
-                    author = "Unknown"
-                    if hasattr(entry, 'author'):
-                        author = entry.author
-
-                    # Extract excerpt from RSS description
-                    excerpt = ""
-                    if hasattr(entry, 'description'):
-                        excerpt = _clean_excerpt(entry.description)
-
-                    articles.append({
-                        'title': entry.title,
-                        'link': entry.link,
-                        'score': score,
-                        'author': author,
-                        'time': time_posted,
-                        'comments': str(comments),
-                        'source': 'Hacker News',
-                        'excerpt': excerpt,
-                        'image_url': _extract_feed_image(entry)
-                    })
-                self.last_status = "ok"
-            else:
-                # Fallback to HTML scraping if RSS fails
-                logger.warning("[HN] RSS empty, falling back to HTML scrape")
-                articles = self._scrape_html(num_pages)
-        except Exception as e:
-            logger.warning(f"[HN] RSS failed ({e}), falling back to HTML")
-            articles = self._scrape_html(num_pages)
-
-        self.scrape_duration = time.time() - start
-        self.last_scrape_time = time.time()
-        logger.info(f"[HN] Done. {len(articles)} articles in {self.scrape_duration:.1f}s")
+        with self._track('HN', 'RSS') as articles:
+            try:
+                # Try RSS first (much faster)
+                feed = self._fetch_feed(self.feed_url)
+                if feed.entries:
+                    for entry in feed.entries:
+                        # hnrss includes score and comment count in the description
+                        desc = entry.get('description') or ""
+                        points_match = _HN_POINTS_RE.search(desc)
+                        comments_match = _HN_COMMENTS_RE.search(desc)
+                        score = int(points_match.group(1)) if points_match else 0
+                        comments = comments_match.group(1) if comments_match else "0"
+
+                        articles.append({
+                            'title': entry.title,
+                            'link': entry.link,
+                            'score': score,
+                            'author': entry.get('author', "Unknown"),
+                            'time': entry.get('published', "Recent"),
+                            'comments': comments,
+                            'source': 'Hacker News',
+                            'excerpt': _clean_excerpt(desc),
+                            'image_url': _extract_feed_image(entry)
+                        })
+                    self._set_status("ok")
+                else:
+                    # Fallback to HTML scraping if RSS fails
+                    logger.warning("[HN] RSS empty, falling back to HTML scrape")
+                    articles[:] = self._scrape_html(num_pages)
+            except Exception as e:
+                logger.warning(f"[HN] RSS failed ({e}), falling back to HTML")
+                articles[:] = self._scrape_html(num_pages)
         return articles
 
     def _scrape_html(self, num_pages: int) -> list[dict]:
-        """Fallback HTML scraper for Hacker News."""
+        """Fallback HTML scraper for Hacker News; fetches the pages concurrently.
+
+        A failed page is skipped rather than discarding the ones that did load.
+        """
         articles = []
-        try:
-            for p in range(1, num_pages + 1):
-                url = f"{self.fallback_url}?p={p}"
-                response = self.session.get(url, timeout=10)
+        failed = []
+        urls = [f"{self.fallback_url}?p={p}" for p in range(1, num_pages + 1)]
+        # A few workers instead of a fixed sleep between pages; the Retry adapter
+        # already backs off if HN answers 429
+        workers = max(1, min(num_pages, self.HTML_PAGE_WORKERS))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self.session.get, url, timeout=10) for url in urls]
+            for url, future in zip(urls, futures):  # keep page order
+                try:
+                    response = future.result()
+                except requests.RequestException as e:
+                    failed.append(f"{url}: {e}")
+                    logger.warning(f"[HN] HTML fallback page failed: {url}: {e}")
+                    continue
                 if response.status_code == 200:
                     articles.extend(self._parse_html(response.text))
-                if p < num_pages:
-                    time.sleep(1)
-            self.last_status = "ok"
-        except requests.RequestException as e:
-            self.last_status = "error"
-            self.last_error = str(e)
-            logger.warning(f"[HN] HTML fallback failed: {e}")
+
+        if not failed:
+            self._set_status("ok")
+        elif len(failed) < len(urls):
+            self._set_status("ok", f"{len(failed)}/{len(urls)} pages failed: {'; '.join(failed)}")
+        else:
+            self._set_status("error", '; '.join(failed))
         return articles
 
     def _parse_html(self, html_content: str) -> list[dict]:
         articles = []
-        soup = BeautifulSoup(html_content, 'html.parser')
+        # Story and metadata rows are all <tr>s; skip building <head>, scripts and the rest
+        soup = BeautifulSoup(html_content, HTML_PARSER, parse_only=_HN_ROWS)
         story_rows = soup.find_all('tr', class_='athing')
 
         for row in story_rows:
             try:
-                title_element = row.find('span', class_='titleline').find('a')
+                title_element = _HN_TITLE_SEL.select_one(row)
                 title = title_element.text
                 link = title_element['href']
                 if not link.startswith('http'):
                     link = f"https://news.ycombinator.com/{link}"
 
                 metadata_row = row.find_next_sibling('tr')
-                subtext = metadata_row.find('td', class_='subtext')
+                subtext = _HN_SUBTEXT_SEL.select_one(metadata_row)
 
                 score = 0
                 author = "Unknown"
@@ -230,25 +390,22 @@ class HackerNewsScraper(BaseScraper):
                 comments = "0"
 
                 if subtext:
-                    score_elem = subtext.find('span', class_='score')
+                    score_elem = _HN_SCORE_SEL.select_one(subtext)
                     if score_elem:
                         score = int(score_elem.text.split()[0])
 
-                    author_elem = subtext.find('a', class_='hnuser')
+                    author_elem = _HN_USER_SEL.select_one(subtext)
                     if author_elem:
                         author = author_elem.text
 
-                    age_elem = subtext.find('span', class_='age')
+                    age_elem = _HN_AGE_SEL.select_one(subtext)
                     if age_elem:
                         time_posted = age_elem.text
 
-                    links = subtext.find_all('a')
-                    for l in links:
-                        if 'comment' in l.text:
-                            comments = l.text.split()[0]
-                            if comments == 'discuss':
-                                comments = "0"
-                            break
+                    comments_elem = _HN_COMMENTS_SEL.select_one(subtext)
+                    if comments_elem:
+                        count = comments_elem.text.split()[0]
+                        comments = count if count.isdigit() else "0"  # 'discuss'
 
                 # HN HTML doesn't have excerpts, leave empty
                 excerpt = ""
@@ -277,47 +434,10 @@ class TechCrunchScraper(BaseScraper):
         self.feed_url: str = "https://techcrunch.com/feed/"
 
     def scrape(self, num_pages: int = 1) -> list[dict]:
-        start = time.time()
-        articles = []
-        logger.info("[TC] Starting RSS scrape...")
-        try:
-            feed = feedparser.parse(self.feed_url)
-            for entry in feed.entries[:25]:
-                author = "TechCrunch"
-                if hasattr(entry, 'author'):
-                    author = entry.author
-
-                time_posted = "Recent"
-                if hasattr(entry, 'published'):
-                    time_posted = entry.published
-
-                # Extract excerpt from RSS description/summary
-                excerpt = ""
-                if hasattr(entry, 'summary'):
-                    excerpt = _clean_excerpt(entry.summary)
-                elif hasattr(entry, 'description'):
-                    excerpt = _clean_excerpt(entry.description)
-
-                articles.append({
-                    'title': entry.title,
-                    'link': entry.link,
-                    'score': 0,
-                    'author': author,
-                    'time': time_posted,
-                    'comments': '0',
-                    'source': 'TechCrunch',
-                    'excerpt': excerpt,
-                    'image_url': _extract_feed_image(entry)
-                })
-            self.last_status = "ok"
-        except Exception as e:
-            self.last_status = "error"
-            self.last_error = str(e)
-            logger.warning(f"[TC] Error: {e}")
-
-        self.scrape_duration = time.time() - start
-        self.last_scrape_time = time.time()
-        logger.info(f"[TC] Done. {len(articles)} articles in {self.scrape_duration:.1f}s")
+        with self._track('TC', 'RSS') as articles:
+            feed = self._fetch_feed(self.feed_url)
+            articles.extend(self._parse_rss_entries(feed, 25, 'TechCrunch', 'TechCrunch'))
+            self._set_status("ok")
         return articles
 
 
@@ -329,13 +449,10 @@ class RedditScraper(BaseScraper):
         self.base_url: str = "https://www.reddit.com/r/technology/top.json?t=day&limit=25"
 
     def scrape(self, num_pages: int = 1) -> list[dict]:
-        start = time.time()
-        articles = []
-        logger.info("[Reddit] Starting JSON scrape...")
-        try:
+        with self._track('Reddit', 'JSON') as articles:
             response = self.session.get(self.base_url, timeout=10)
             if response.status_code == 200:
-                data = response.json()
+                data = _json_loads(response.content)
                 children = data.get('data', {}).get('children', [])
 
                 for post in children:
@@ -360,15 +477,7 @@ class RedditScraper(BaseScraper):
                             else p_data.get('preview', {}).get('images', [{}])[0].get('source', {}).get('url', '')
                         )
                     })
-            self.last_status = "ok"
-        except requests.RequestException as e:
-            self.last_status = "error"
-            self.last_error = str(e)
-            logger.warning(f"[Reddit] Error: {e}")
-
-        self.scrape_duration = time.time() - start
-        self.last_scrape_time = time.time()
-        logger.info(f"[Reddit] Done. {len(articles)} articles in {self.scrape_duration:.1f}s")
+            self._set_status("ok")
         return articles
 
 
@@ -380,47 +489,10 @@ class TheVergeScraper(BaseScraper):
         self.feed_url: str = "https://www.theverge.com/rss/index.xml"
 
     def scrape(self, num_pages: int = 1) -> list[dict]:
-        start = time.time()
-        articles = []
-        logger.info("[Verge] Starting RSS scrape...")
-        try:
-            feed = feedparser.parse(self.feed_url)
-            for entry in feed.entries[:15]:
-                author = "The Verge Staff"
-                if hasattr(entry, 'author'):
-                    author = entry.author
-
-                time_posted = "Recent"
-                if hasattr(entry, 'published'):
-                    time_posted = entry.published
-
-                # Extract excerpt from RSS summary/description
-                excerpt = ""
-                if hasattr(entry, 'summary'):
-                    excerpt = _clean_excerpt(entry.summary)
-                elif hasattr(entry, 'description'):
-                    excerpt = _clean_excerpt(entry.description)
-
-                articles.append({
-                    'title': entry.title,
-                    'link': entry.link,
-                    'score': 0,
-                    'author': author,
-                    'time': time_posted,
-                    'comments': '0',
-                    'source': 'The Verge',
-                    'excerpt': excerpt,
-                    'image_url': _extract_feed_image(entry)
-                })
-            self.last_status = "ok"
-        except Exception as e:
-            self.last_status = "error"
-            self.last_error = str(e)
-            logger.warning(f"[Verge] Error: {e}")
-
-        self.scrape_duration = time.time() - start
-        self.last_scrape_time = time.time()
-        logger.info(f"[Verge] Done. {len(articles)} articles in {self.scrape_duration:.1f}s")
+        with self._track('Verge', 'RSS') as articles:
+            feed = self._fetch_feed(self.feed_url)
+            articles.extend(self._parse_rss_entries(feed, 15, 'The Verge', 'The Verge Staff'))
+            self._set_status("ok")
         return articles
 
 
@@ -432,54 +504,27 @@ class ArsTechnicaScraper(BaseScraper):
         self.feed_url: str = "https://feeds.arstechnica.com/arstechnica/index"
 
     def scrape(self, num_pages: int = 1) -> list[dict]:
-        start = time.time()
-        articles = []
-        logger.info("[Ars] Starting RSS scrape...")
-        try:
-            feed = feedparser.parse(self.feed_url)
-            for entry in feed.entries[:15]:
-                author = "Ars Staff"
-                if hasattr(entry, 'author'):
-                    author = entry.author
-
-                time_posted = "Recent"
-                if hasattr(entry, 'published'):
-                    time_posted = entry.published
-
-                # Extract excerpt from RSS summary/description
-                excerpt = ""
-                if hasattr(entry, 'summary'):
-                    excerpt = _clean_excerpt(entry.summary)
-                elif hasattr(entry, 'description'):
-                    excerpt = _clean_excerpt(entry.description)
+        with self._track('Ars', 'RSS') as articles:
+            feed = self._fetch_feed(self.feed_url)
+            articles.extend(self._parse_rss_entries(feed, 15, 'Ars Technica', 'Ars Staff'))
+            self._set_status("ok")
+        return articles
 
-                articles.append({
-                    'title': entry.title,
-                    'link': entry.link,
-                    'score': 0,
-                    'author': author,
-                    'time': time_posted,
-                    'comments': '0',
-                    'source': 'Ars Technica',
-                    'excerpt': excerpt,
-                    'image_url': _extract_feed_image(entry)
-                })
-            self.last_status = "ok"
-        except Exception as e:
-            self.last_status = "error"
-            self.last_error = str(e)
-            logger.warning(f"[Ars] Error: {e}")
 
-        self.scrape_duration = time.time() - start
-        self.last_scrape_time = time.time()
-        logger.info(f"[Ars] Done. {len(articles)} articles in {self.scrape_duration:.1f}s")
-        return articles
+def _run_scraper(scraper: BaseScraper, pages: int, generation: int) -> list[dict]:
+    """Runs one scrape on a pool thread, tagged with the generation it was started for."""
+    _scrape_run.generation = generation
+    try:
+        return scraper.scrape(pages)
+    finally:
+        del _scrape_run.generation
 
 
 class NewsAggregator:
     """Aggregates articles from all scrapers with caching and health tracking."""
 
     CACHE_TTL = 300  # 5 minutes
+    SCRAPE_TIMEOUT = 30  # seconds allowed per source before its results are dropped
 
     def __init__(self) -> None:
         self.scrapers: list[BaseScraper] = [
@@ -501,28 +546,47 @@ class NewsAggregator:
 
         self.articles = []
 
-        # Run all scrapers concurrently using asyncio.gather
-        scrape_tasks = []
-        for scraper in self.scrapers:
-            pages = hn_pages if isinstance(scraper, HackerNewsScraper) else 1
-            scrape_tasks.append(asyncio.to_thread(scraper.scrape, pages))
+        # Run all scrapers concurrently using asyncio.gather; a slow source
+        # times out on its own instead of holding up the whole batch.
+        # A timeout can't stop the thread, so they run on a private pool that is
+        # never joined: asyncio.run() would otherwise wait on a hung scrape.
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=len(self.scrapers), thread_name_prefix='scraper')
+        try:
+            scrape_tasks = []
+            for scraper in self.scrapers:
+                pages = hn_pages if isinstance(scraper, HackerNewsScraper) else 1
+                run = loop.run_in_executor(executor, _run_scraper, scraper, pages, scraper.generation)
+                scrape_tasks.append(asyncio.wait_for(run, timeout=self.SCRAPE_TIMEOUT))
 
-        results = await asyncio.gather(*scrape_tasks, return_exceptions=True)
+            results = await asyncio.gather(*scrape_tasks, return_exceptions=True)
+        finally:
+            executor.shutdown(wait=False)
 
+        scraped = []
         for scraper, result in zip(self.scrapers, results):
+            if isinstance(result, asyncio.TimeoutError):
+                # The orphaned thread may still finish; keep it from overwriting this
+                scraper.abandon_run()
+                scraper.last_status = "error"
+                scraper.last_error = f"Timed out after {self.SCRAPE_TIMEOUT}s"
+                logger.error(f"Scraper {scraper.__class__.__name__} timed out")
+                continue
             if isinstance(result, Exception):
                 logger.error(f"Scraper {scraper.__class__.__name__} failed: {result}")
                 continue
             if result:
-                # Apply credibility filter before adding
-                valid_articles = []
-                for a in result:
-                    if is_credible(a.get('title', ''), a.get('link', '')):
-                        # Add credibility details to article
-                        _, cred = score_article(a.get('title', ''), a.get('link', ''))
-                        a['credibility'] = cred
-                        valid_articles.append(a)
-                self.articles.extend(valid_articles)
+                scraped.extend(result)
+
+        # The same story often arrives from several sources; drop repeats before
+        # the per-article credibility scoring and image fetches
+        for a in _dedupe_by_url(scraped):
+            # Apply credibility filter before adding
+            if is_credible(a.get('title', ''), a.get('link', '')):
+                # Add credibility details to article
+                _, cred = score_article(a.get('title', ''), a.get('link', ''))
+                a['credibility'] = cred
+                self.articles.append(a)
 
         # Async image enrichment (single event loop)
         await self._enrich_images_async()